@@ -1,30 +1,43 @@
 """
 Combined entry point: runs both the scheduler and dashboard API.
 - Dashboard API runs on PORT (default 5000)
-- Scheduler runs in a background thread
+- Scheduler runs in a background thread (set RUN_SCHEDULER=0 to serve the
+  dashboard only, e.g. on a second replica -- exactly one process should poll
+  YouTube, or every copy burns quota and races the others on Postgres)
 """
+import logging
 import os
 import threading
 
+from config import setup_logging
 from dashboard_api import app, init_db
 from main import run_scheduler
 
+logger = logging.getLogger(__name__)
+
+RUN_SCHEDULER = os.environ.get("RUN_SCHEDULER", "1").strip().lower() in ("1", "true", "yes")
+
 
 def start_scheduler():
     """Run scheduler in background thread."""
-    print("Starting scheduler in background thread...")
+    logger.info("Starting scheduler in background thread...")
     run_scheduler()
 
 
 if __name__ == "__main__":
+    setup_logging()
+
     # Initialize database
     init_db()
     
     # Start scheduler in background thread
-    scheduler_thread = threading.Thread(target=start_scheduler, daemon=True)
-    scheduler_thread.start()
+    if RUN_SCHEDULER:
+        scheduler_thread = threading.Thread(target=start_scheduler, daemon=True)
+        scheduler_thread.start()
+    else:
+        logger.info("RUN_SCHEDULER is off -- serving the dashboard only.")
     
     # Run Flask app (blocks main thread)
     port = int(os.environ.get("PORT", 8080))
-    print(f"Starting dashboard API on port {port}...")
+    logger.info("Starting dashboard API on port %d...", port)
     app.run(host="0.0.0.0", port=port, debug=False)
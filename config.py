@@ -1,7 +1,13 @@
 """Config from environment. Set these in Railway (or .env locally)."""
+import atexit
+import functools
+import logging
+import logging.handlers
 import os
-from datetime import datetime, date
-from typing import List
+import queue
+import sys
+from datetime import date
+from typing import List, Tuple
 
 from dotenv import load_dotenv
 
@@ -31,17 +37,45 @@ def parse_channels_str(raw: str) -> List[tuple]:
 
 
 CHANNELS_STR = os.environ.get("YOUTUBE_CHANNELS", "UCHnyfMqiRRG1u-2MsSQLbXA:Veritasium")
-CHANNELS: List[tuple[str, str]] = parse_channels_str(CHANNELS_STR)
+
+
+@functools.lru_cache(maxsize=1)
+def get_channels() -> Tuple[Tuple[str, str], ...]:
+    """The parsed seed list, computed once on first use. Tests (or anything that
+    changes the env at runtime) can call get_channels.cache_clear() to re-read."""
+    raw = os.environ.get("YOUTUBE_CHANNELS", CHANNELS_STR)
+    return tuple(parse_channels_str(raw))
+
+
+CHANNELS: Tuple[Tuple[str, str], ...] = get_channels()  # back-compat alias
 
 # Thread pool size for the scheduler (channel checks + active-video sampling).
 # I/O-bound work, so this can comfortably exceed CPU core count.
 SCHEDULER_WORKERS = int(os.environ.get("SCHEDULER_WORKERS", "24"))
 
-# DB connection pool ceiling. Must exceed SCHEDULER_WORKERS (each worker may hold
-# a connection briefly) plus headroom for concurrent Flask API requests, or the
-# pool raises "connection pool exhausted" under load. Keep below the Postgres
-# server's max_connections (Railway Postgres defaults to ~100).
-DB_POOL_MAX = int(os.environ.get("DB_POOL_MAX", "32"))
+# Separate, smaller pool for the per-channel RSS checks. Kept apart from the
+# SCHEDULER_WORKERS pool (sampling/commenting, which can run for minutes per
+# video) so a burst of new uploads or a running hourly sweep filling that pool
+# can't queue the next new-video check's feed fetches behind them. (The sweep is
+# fed to that pool from its own thread -- see main.check_active_videos -- so the
+# scheduler thread is free to start each new-video check on time.)
+POLL_WORKERS = int(os.environ.get("POLL_WORKERS", "8"))
+
+# Max active videos the hourly sweep has queued/running at once. Each one fans
+# out to ~8 concurrent InnerTube requests, so handing the whole sweep to the
+# SCHEDULER_WORKERS pool would put ~200 requests in flight from one IP -- enough
+# to draw throttling -- and queue a fresh upload's fast path behind the sweep.
+# A lower cap means a longer sweep; if one is still running when the next is
+# due, that next sweep is skipped rather than stacked on top of it.
+SWEEP_CONCURRENCY = int(os.environ.get("SWEEP_CONCURRENCY", "8"))
+
+# DB connection pool ceiling. Needs SCHEDULER_WORKERS + POLL_WORKERS (each
+# worker may hold a connection briefly) plus headroom for concurrent Flask API
+# requests, or the pool raises "connection pool exhausted" under load. The
+# default is 24 + 8 + 8; get_pool never goes below that sum, even if this is
+# set lower. Keep below the Postgres server's max_connections (Railway
+# Postgres defaults to ~100).
+DB_POOL_MAX = int(os.environ.get("DB_POOL_MAX", "40"))
 
 # OAuth for posting/editing comments
 YOUTUBE_CLIENT_ID = os.environ.get("YOUTUBE_CLIENT_ID", "")
@@ -51,12 +85,19 @@ YOUTUBE_REFRESH_TOKEN = os.environ.get("YOUTUBE_REFRESH_TOKEN", "")
 # Date cutoff: only process videos from this date onwards (checked on every call)
 CUTOFF_DATE_STR = os.environ.get("CUTOFF_DATE", "2026-02-08")
 try:
-    CUTOFF_DATE = datetime.strptime(CUTOFF_DATE_STR, "%Y-%m-%d").date()
+    CUTOFF_DATE = date.fromisoformat(CUTOFF_DATE_STR)
 except ValueError:
     CUTOFF_DATE = date(2026, 2, 8)  # Default: Feb 8, 2026
 
 # Polling intervals (in seconds)
 NEW_VIDEO_CHECK_INTERVAL = int(os.environ.get("NEW_VIDEO_CHECK_INTERVAL", "180"))  # 3 minutes
+# Per-channel adaptive backoff for the new-video check: a channel whose feed had
+# nothing new is polled 1.5x less often each time, up to this ceiling, and snaps
+# back to NEW_VIDEO_CHECK_INTERVAL as soon as it posts. Channels that upload
+# rarely stop costing a feed fetch every 3 minutes; worst-case detection delay
+# for a quiet channel's next upload is this value. Set equal to
+# NEW_VIDEO_CHECK_INTERVAL to disable.
+MAX_NEW_VIDEO_INTERVAL = int(os.environ.get("MAX_NEW_VIDEO_INTERVAL", "900"))  # 15 minutes
 ACTIVE_VIDEO_CHECK_INTERVAL = int(os.environ.get("ACTIVE_VIDEO_CHECK_INTERVAL", "3600"))  # 1 hour
 
 # How often to refresh each comment's engagement metrics (likes/replies/moderation
@@ -85,6 +126,16 @@ SAMPLES_PER_RUN = int(os.environ.get("SAMPLES_PER_RUN", "40"))
 # comment (maintenance), so they stay at the smaller SAMPLES_PER_RUN.
 FAST_SAMPLES = int(os.environ.get("FAST_SAMPLES", "90"))  # Quick burst before first comment
 
+# When SAMPLES_PER_RUN exceeds FAST_SAMPLES, a new video gets a second, slower
+# round of samples after the burst. That round is skipped if the burst saw only
+# one title AND the video is already older than this many seconds: title tests
+# are set up around upload, so an hours-old video (e.g. one picked up by the
+# startup reprocess) showing a single title in ~90 samples isn't worth the extra
+# requests now -- the hourly sweep keeps sampling it anyway. With the defaults
+# above (40 < 90) there is no second round, so this has no effect unless
+# SAMPLES_PER_RUN is raised past FAST_SAMPLES.
+FAST_PATH_SKIP_STABLE_AGE = int(os.environ.get("FAST_PATH_SKIP_STABLE_AGE", "7200"))  # 2 hours
+
 # The displayed A/B split is computed over a rolling window, not lifetime, so it
 # reflects the experiment's CURRENT ratio (YouTube shifts traffic over time and
 # ends tests). Distinct-variant detection still uses all-time samples.
@@ -116,3 +167,26 @@ COMMENT_INTROS = [
 
 # Set to 1 to run without posting/updating YouTube comment
 SKIP_COMMENT = os.environ.get("SKIP_COMMENT", "0").strip().lower() in ("1", "true", "yes")
+
+# Log level for the app's own loggers (scheduler, scraper, comment client, API).
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").strip().upper()
+
+
+@functools.lru_cache(maxsize=1)
+def setup_logging() -> None:
+    """Route all logging through one queue drained by a single writer thread.
+
+    Dozens of scheduler workers log concurrently; with a QueueHandler each call
+    is just an in-memory put, and only the listener thread touches stdout --
+    so workers never contend on the stream lock or block on a slow pipe.
+    Idempotent (cached), so every entry point can call it.
+    """
+    log_queue = queue.SimpleQueue()
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(LOG_LEVEL)
+    listener.start()
+    atexit.register(listener.stop)
@@ -10,8 +10,11 @@ one is configured. On top of that every response carries hardening headers,
 requests are rate limited per client, error bodies are generic (no internal
 detail leaks), CORS is locked down by default, and request bodies are capped.
 """
+import decimal
 import functools
+import hashlib
 import hmac
+import json
 import logging
 import os
 import re
@@ -21,6 +24,7 @@ from collections import defaultdict, deque
 from datetime import datetime, date
 
 from flask import Flask, jsonify, request, send_file
+from flask_compress import Compress
 from flask_cors import CORS
 from werkzeug.middleware.proxy_fix import ProxyFix
 
@@ -28,8 +32,10 @@ from config import parse_channels_str
 from scraper import resolve_channel_id
 from storage import (
     add_channel_admin,
+    clear_all_data,
     get_all_videos_summary,
     get_channels_with_metrics,
+    get_stats_counts,
     get_title_daily_counts,
     get_video_info,
     init_db,
@@ -43,6 +49,10 @@ app = Flask(__name__)
 # more lets clients spoof X-Forwarded-For.
 app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1)
 
+# gzip JSON responses -- /api/videos is polled every 30s and compresses ~10x.
+app.config["COMPRESS_MIMETYPES"] = ["application/json"]
+Compress(app)
+
 # Cap request bodies (none of our endpoints need a payload) to blunt memory abuse.
 app.config["MAX_CONTENT_LENGTH"] = 64 * 1024  # 64 KB
 
@@ -65,6 +75,11 @@ if _cors_origins:
 RATE_LIMIT_PER_MINUTE = int(os.environ.get("RATE_LIMIT_PER_MINUTE", "240"))
 RESET_RATE_LIMIT_PER_MINUTE = int(os.environ.get("RESET_RATE_LIMIT_PER_MINUTE", "5"))
 
+# How long one get_all_videos_summary() result is reused by /api/videos. The
+# dashboard polls every 30s per open tab, so a couple of seconds collapses
+# simultaneous refreshes into a single aggregate query.
+SUMMARY_CACHE_SECONDS = float(os.environ.get("SUMMARY_CACHE_SECONDS", "2"))
+
 # Plausible YouTube video id (validate path params before touching the DB).
 _VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,20}$")
 
@@ -115,6 +130,50 @@ def _enforce_rate_limit():
     return None
 
 
+# ---------------------------------------------------------------------------
+# Short-lived summary cache for /api/videos
+# ---------------------------------------------------------------------------
+_summary_lock = threading.Lock()
+_summary_cache: dict = {"t": 0.0, "body": None, "etag": None}
+
+
+def _cached_videos_body() -> tuple[str, str]:
+    """Serialized ``{"videos": get_all_videos_summary()}`` and its content-hash
+    ETag, reused for SUMMARY_CACHE_SECONDS. The refresh happens under a lock so
+    concurrent requests that find it stale wait for one query instead of each
+    issuing their own, and cache hits skip serialization entirely."""
+    with _summary_lock:
+        now = time.monotonic()
+        if _summary_cache["body"] is None or now - _summary_cache["t"] > SUMMARY_CACHE_SECONDS:
+            body = json.dumps(
+                {"videos": get_all_videos_summary()},
+                default=_json_default,
+                separators=(",", ":"),
+            )
+            _summary_cache["body"] = body
+            _summary_cache["etag"] = hashlib.blake2b(body.encode(), digest_size=16).hexdigest()
+            _summary_cache["t"] = now
+        return _summary_cache["body"], _summary_cache["etag"]
+
+
+def _matching_etag(etag: str):
+    """The If-None-Match entry matching ``etag`` -- bare, or with the
+    ":<encoding>" suffix flask-compress appends -- or None."""
+    algorithms = app.config.get("COMPRESS_ALGORITHM") or ()
+    if isinstance(algorithms, str):
+        algorithms = [a.strip() for a in algorithms.split(",")]
+    for tag in (etag, *(f"{etag}:{alg}" for alg in algorithms)):
+        if request.if_none_match.contains(tag):
+            return tag
+    return None
+
+
+def _invalidate_summary():
+    """Drop the cached summary (after writes that change what it reports)."""
+    with _summary_lock:
+        _summary_cache["body"] = None
+
+
 # ---------------------------------------------------------------------------
 # Security headers
 # ---------------------------------------------------------------------------
@@ -169,11 +228,21 @@ def require_admin(fn):
     return wrapper
 
 
-def serialize_value(value):
-    """Convert datetime/date objects to ISO strings for JSON."""
-    if isinstance(value, (datetime, date)):
-        return value.isoformat()
-    return value
+def _json_default(o):
+    """json.dumps hook for the non-native types our rows carry. Only called for
+    values json can't encode itself, so plain str/int fields cost nothing."""
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if isinstance(o, decimal.Decimal):
+        return str(o)  # same as Flask's provider did for AVG()/division columns
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _json_response(payload, status: int = 200):
+    """Serialize ``payload`` in one json.dumps pass (no per-field pre-walk) and
+    wrap it in a JSON response."""
+    body = json.dumps(payload, default=_json_default, separators=(",", ":"))
+    return app.response_class(body, status=status, mimetype="application/json")
 
 
 def _server_error(exc):
@@ -204,16 +273,8 @@ def admin_page():
 def reset_database():
     """Clear all data from database. Admin-only; use with caution!"""
     try:
-        from storage import get_conn, get_pool
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("DELETE FROM title_samples;")
-        cur.execute("DELETE FROM title_history;")
-        cur.execute("DELETE FROM videos;")
-        cur.execute("DELETE FROM channels;")
-        conn.commit()
-        cur.close()
-        get_pool().putconn(conn)
+        clear_all_data()
+        _invalidate_summary()
         logger.warning("Database reset performed by admin from %s", _client_ip())
         return jsonify({"status": "ok", "message": "Database cleared"})
     except Exception as e:
@@ -227,11 +288,7 @@ def list_channels():
     comments/month, avg likes+replies per comment) for the admin UI's
     include/exclude decision."""
     try:
-        channels = get_channels_with_metrics()
-        for ch in channels:
-            for key, value in ch.items():
-                ch[key] = serialize_value(value)
-        return jsonify({"channels": channels})
+        return _json_response({"channels": get_channels_with_metrics()})
     except Exception as e:
         return _server_error(e)
 
@@ -326,11 +383,19 @@ def health():
 def get_videos():
     """Get all videos (dashboard will filter by is_active)."""
     try:
-        videos = get_all_videos_summary()
-        for video in videos:
-            for key, value in video.items():
-                video[key] = serialize_value(value)
-        return jsonify({"videos": videos})
+        body, etag = _cached_videos_body()
+        # Polls usually find nothing changed; a matching If-None-Match gets an
+        # empty 304 instead of the full list. flask-compress sends the ETag as
+        # "<hash>:<encoding>", so that's what browsers echo back -- match those
+        # here, before building (and re-compressing) a full response.
+        not_modified = _matching_etag(etag)
+        if not_modified:
+            resp = app.response_class(status=304)
+            resp.set_etag(not_modified)
+            return resp
+        resp = app.response_class(body, mimetype="application/json")
+        resp.set_etag(etag)
+        return resp.make_conditional(request)
     except Exception as e:
         return _server_error(e)
 
@@ -345,16 +410,9 @@ def get_video(video_id: str):
         if not video:
             return jsonify({"error": "Video not found"}), 404
 
-        # Convert datetime/date objects
-        for key, value in video.items():
-            video[key] = serialize_value(value)
-
         # Per-day title breakdown for the history timeline.
         timeline = get_title_daily_counts(video_id)
-        for row in timeline:
-            row["day"] = serialize_value(row["day"])
-
-        return jsonify({"video": video, "timeline": timeline})
+        return _json_response({"video": video, "timeline": timeline})
     except Exception as e:
         return _server_error(e)
 
@@ -363,20 +421,17 @@ def get_video(video_id: str):
 def get_stats():
     """Get overall statistics."""
     try:
-        all_videos = get_all_videos_summary()
-
         # Active = is_active=TRUE (being tracked, shown in dashboard)
         # Inactive = is_active=FALSE (reference points / stagnated)
-        active = [v for v in all_videos if v.get("is_active")]
-        inactive = [v for v in all_videos if not v.get("is_active")]
+        counts = get_stats_counts()
 
         from config import RATIO_WINDOW_DAYS
         return jsonify({
-            "active_videos": len(active),
-            "with_comments": sum(1 for v in active if v.get("comment_id")),
-            "multi_title": sum(1 for v in active if (v.get("unique_titles") or 0) >= 2),
-            "inactive_videos": len(inactive),
-            "total_in_db": len(all_videos),
+            "active_videos": counts["active_videos"],
+            "with_comments": counts["with_comments"],
+            "multi_title": counts["multi_title"],
+            "inactive_videos": counts["inactive_videos"],
+            "total_in_db": counts["total_in_db"],
             "ratio_window_days": RATIO_WINDOW_DAYS,
         })
     except Exception as e:
@@ -0,0 +1,30 @@
+"""
+Gunicorn settings for production (Railway): `gunicorn -c gunicorn.conf.py app:app`.
+
+One gthread worker with a handful of threads. Keep it at ONE worker: the
+scheduler thread is started inside the worker (below), and the rate limiter and
+summary cache in dashboard_api are in-process -- N workers would mean N copies
+of the scheduler polling YouTube and N independent rate-limit budgets. To split
+the scheduler out instead, set RUN_SCHEDULER=0 here and run `python main.py` as
+its own service.
+"""
+import os
+import threading
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+worker_class = "gthread"
+workers = 1
+threads = int(os.environ.get("WEB_THREADS", "8"))
+timeout = 60
+
+
+def post_worker_init(worker):
+    """Create the schema and start the scheduler thread once the worker is up."""
+    from app import RUN_SCHEDULER, start_scheduler
+    from config import setup_logging
+    from dashboard_api import init_db
+
+    setup_logging()
+    init_db()
+    if RUN_SCHEDULER:
+        threading.Thread(target=start_scheduler, name="scheduler", daemon=True).start()
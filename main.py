@@ -2,47 +2,58 @@
 Main scheduler: checks for new videos every 3 minutes, checks active videos every hour.
 Processes videos immediately and tracks title history.
 """
+import functools
 import hashlib
+import heapq
+import logging
+import random
 import sys
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime
-from typing import List
+from typing import List, NamedTuple, Optional
 
 from config import (
     ACTIVE_VIDEO_CHECK_INTERVAL,
-    CHANNELS,
     COMMENT_INTROS,
     COMMENT_REFRESH_HOURS,
     CUTOFF_DATE,
+    FAST_PATH_SKIP_STABLE_AGE,
     FAST_SAMPLES,
     INACTIVE_DAYS_THRESHOLD,
+    MAX_NEW_VIDEO_INTERVAL,
     META_REFRESH_INTERVAL,
     NEW_VIDEO_CHECK_INTERVAL,
+    POLL_WORKERS,
     RATIO_WINDOW_DAYS,
     SAMPLES_PER_RUN,
     SCHEDULER_WORKERS,
     SKIP_COMMENT,
+    SWEEP_CONCURRENCY,
+    get_channels,
+    setup_logging,
 )
-from scraper import get_videos_from_rss, is_short, sample_titles
+from scraper import SHORTS_PROBE_WORKERS, get_videos_from_rss, probe_short, sample_titles
 from storage import (
-    add_title_sample,
+    add_title_samples,
     add_video,
     get_active_videos,
     get_comment_id,
     get_comment_state,
     get_enabled_channels,
-    get_known_video_ids_for_channel,
+    get_known_video_id_sets,
     get_recent_title_stats,
+    get_short_flags,
+    get_stagnated_video_ids,
     get_title_stats,
-    get_total_samples,
     get_videos_without_comments,
     init_db,
-    is_video_active,
     mark_video_ignored,
     mark_video_inactive,
     seed_channel_if_missing,
     set_comment_id,
+    set_short_flags,
     update_comment_edited,
     update_comment_meta,
     update_last_checked,
@@ -50,10 +61,18 @@ from storage import (
 )
 from youtube_comment import fetch_comment_meta, post_comment, update_comment
 
-# Thread pool for background processing (channel checks, video sampling).
-# I/O-bound work, so this can comfortably exceed CPU core count -- sized via
-# SCHEDULER_WORKERS to give headroom as more channels are tracked.
-executor = ThreadPoolExecutor(max_workers=SCHEDULER_WORKERS)
+logger = logging.getLogger(__name__)
+
+# Thread pools. I/O-bound work, so both can comfortably exceed CPU core count.
+# - poll_executor: per-channel RSS checks (short, latency-sensitive).
+# - executor: video sampling + commenting (process_video, the hourly sweep),
+#   sized via SCHEDULER_WORKERS to give headroom as more channels are tracked.
+# Split so long-running sampling can never delay the next new-video poll.
+poll_executor = ThreadPoolExecutor(max_workers=POLL_WORKERS, thread_name_prefix="poll")
+executor = ThreadPoolExecutor(max_workers=SCHEDULER_WORKERS, thread_name_prefix="proc")
+
+# Set by stop_scheduler() to end scheduler_loop().
+_stop_event = threading.Event()
 
 # NOTE on pause/resume with no backfill: there is deliberately no "anchor
 # resync" step. A channel's per-channel track_from_date cutoff is bumped to
@@ -66,37 +85,55 @@ executor = ThreadPoolExecutor(max_workers=SCHEDULER_WORKERS)
 
 
 def reprocess_videos_without_comments():
-    """Find and reprocess any active videos that don't have comments yet."""
+    """Find and reprocess any active videos that don't have comments yet.
+
+    After a long outage this backlog can be large, so it is fed to the executor
+    from a helper thread with at most 2x SCHEDULER_WORKERS tasks queued at once
+    (each holds samples in memory and wants a DB connection) -- and without
+    holding up the scheduler loop, which starts right after bootstrap.
+    """
     videos = get_videos_without_comments()
     if not videos:
-        print("No videos without comments to reprocess")
+        logger.info("No videos without comments to reprocess")
         return
     
-    print(f"Found {len(videos)} videos without comments - reprocessing...")
+    logger.info("Found %d videos without comments - reprocessing...", len(videos))
+    threading.Thread(
+        target=_submit_reprocess_backlog, args=(videos,), name="reprocess", daemon=True
+    ).start()
+
+
+def _submit_reprocess_backlog(videos: List[dict]) -> None:
+    slots = threading.BoundedSemaphore(SCHEDULER_WORKERS * 2)
     for video in videos:
-        video_id = video["video_id"]
-        channel_id = video["channel_id"]
+        slots.acquire()
+        if _stop_event.is_set():
+            return
         channel_name = video["channel_name"]
-        published_at = video["published_at"]
-        
-        executor.submit(process_video, video_id, channel_id, channel_name, published_at)
-        print(f"[{channel_name}] Spawned reprocess task for {video_id}")
+        future = executor.submit(
+            process_video, video["video_id"], video["channel_id"], channel_name, video["published_at"]
+        )
+        future.add_done_callback(lambda _f: slots.release())
+        logger.info("[%s] Spawned reprocess task for %s", channel_name, video["video_id"])
 
 
 _MAX_VARIANTS_SHOWN = 6
 
 # A few body openers, picked deterministically per video so comments don't read
 # like copy-paste while staying stable across re-renders (see _pick).
-_BODY_LEADS = [
+_BODY_LEADS = (
     "Different people are being shown different titles on this one — right now it's roughly:",
     "YouTube's quietly testing a few titles here. At the moment it's about:",
     "Heads up: the title you see depends on who you are. Right now it's roughly:",
     "Caught YouTube swapping the title around on this video. Lately it's about:",
-]
+)
+_INTROS = tuple(COMMENT_INTROS)
 
 
-def _pick(options: list, video_id: str, salt: str = "") -> str:
-    """Stable per-video choice from `options` (same video -> same pick)."""
+@functools.lru_cache(maxsize=4096)
+def _pick(options: tuple, video_id: str, salt: str = "") -> str:
+    """Stable per-video choice from `options` (same video -> same pick).
+    Memoized: every hourly re-render of a video asks for the same picks."""
     idx = int(hashlib.md5((salt + video_id).encode()).hexdigest(), 16) % len(options)
     return options[idx]
 
@@ -150,15 +187,19 @@ def render_comment(intro: str, recent_stats: list, all_time_stats: list,
 def _intro_for(video_id: str) -> str:
     """Pick an intro deterministically per video (stable across re-renders so the
     hourly job doesn't re-edit just because an intro was re-randomized)."""
-    return _pick(COMMENT_INTROS, video_id)
+    return _pick(_INTROS, video_id)
 
 
-def build_comment_text(video_id: str) -> str:
-    """Build comment text from this video's stored title samples."""
+def build_comment_text(video_id: str, all_time_stats: list = None) -> str:
+    """Build comment text from this video's stored title samples.
+
+    all_time_stats: get_title_stats(video_id), if the caller already has it."""
+    if all_time_stats is None:
+        all_time_stats = get_title_stats(video_id)
     return render_comment(
         _intro_for(video_id),
         get_recent_title_stats(video_id, RATIO_WINDOW_DAYS),
-        get_title_stats(video_id),
+        all_time_stats,
         video_id,
     )
 
@@ -168,7 +209,8 @@ def _distinct_titles(video_id: str) -> frozenset:
     return frozenset(title for title, _ in get_title_stats(video_id))
 
 
-def _maybe_update_comment(video_id: str, channel_name: str, before_titles) -> None:
+def _maybe_update_comment(video_id: str, channel_name: str, before_titles,
+                          new_titles: frozenset = frozenset()) -> None:
     """Re-edit the comment when its rendered text actually changed.
 
     A NEW title variant updates immediately (timely). Percentage-only drift also
@@ -184,52 +226,71 @@ def _maybe_update_comment(video_id: str, channel_name: str, before_titles) -> No
     new_text = build_comment_text(video_id)
     if new_text == state["comment_text"]:
         return  # nothing visibly changed
-    set_changed = before_titles is None or _distinct_titles(video_id) != before_titles
+    # The distinct set after this run is before | new_titles, so a variant is
+    # new exactly when new_titles isn't already covered -- no re-query needed.
+    set_changed = before_titles is None or not new_titles <= before_titles
     if not set_changed and not state["refresh_due"]:
         return  # only % drift, and we refreshed recently -> wait
     try:
         if update_comment(state["comment_id"], new_text):
             update_comment_edited(video_id, new_text)
-            print(f"[{channel_name}] Updated comment for {video_id}", flush=True)
+            logger.info("[%s] Updated comment for %s", channel_name, video_id)
     except Exception:
         # 404/403 -> comment was deleted by the uploader; stop tracking it.
-        print(f"[{channel_name}] Comment deleted for {video_id} - marking ignored", flush=True)
+        logger.warning("[%s] Comment deleted for %s - marking ignored", channel_name, video_id)
         mark_video_ignored(video_id)
 
 
-def _ensure_comment(video_id: str, channel_name: str, before_titles=None) -> None:
+def _ensure_comment(video_id: str, channel_name: str, comment_id: Optional[str],
+                    before_titles=None, new_titles: frozenset = frozenset()) -> Optional[str]:
     """Post a comment, or update an existing one.
 
     A new comment is only posted once we've actually observed >= 2 distinct
     titles -- otherwise we'd be claiming an A/B test we have no evidence for
     (and most "first 15 samples" only ever see the dominant title). Existing
     comments are refreshed when a new variant turns up.
+
+    comment_id: the video's current comment id (None if none yet), as already
+    known to the caller. Returns the comment id afterwards, so callers can
+    thread it through instead of re-reading it.
+    before_titles/new_titles: distinct titles known before this run and the
+    distinct titles it just recorded (see _record_samples).
     """
     if SKIP_COMMENT:
-        return
-    if get_comment_id(video_id):
-        _maybe_update_comment(video_id, channel_name, before_titles)
-        return
-    if len(_distinct_titles(video_id)) < 2:
-        return  # not enough evidence yet -- wait for more samples to accrue
-    text = build_comment_text(video_id)
+        return comment_id
+    if comment_id:
+        _maybe_update_comment(video_id, channel_name, before_titles, new_titles)
+        return comment_id
+    all_time_stats = get_title_stats(video_id)
+    if len(all_time_stats) < 2:
+        return None  # not enough evidence yet -- wait for more samples to accrue
+    text = build_comment_text(video_id, all_time_stats)
     new_id, status = post_comment(video_id, text)
     if new_id:
         set_comment_id(video_id, new_id, status, text)
-        print(f"[{channel_name}] Comment posted for {video_id} (status: {status})", flush=True)
+        logger.info("[%s] Comment posted for %s (status: %s)", channel_name, video_id, status)
     elif status == "quota_exceeded":
-        print(f"[{channel_name}] Quota exceeded - no comment for {video_id}", flush=True)
+        logger.warning("[%s] Quota exceeded - no comment for %s", channel_name, video_id)
     else:
-        print(f"[{channel_name}] Failed to post comment for {video_id}", flush=True)
+        logger.warning("[%s] Failed to post comment for %s", channel_name, video_id)
+    return new_id
 
 
-def _record_samples(video_id: str, titles: list) -> None:
-    """Persist raw samples and roll them into today's title history."""
+def _record_samples(video_id: str, titles: list) -> frozenset:
+    """Persist raw samples and roll them into today's title history. Returns the
+    distinct titles recorded, for callers that need to know what was new."""
     if not titles:
-        return
-    for title in titles:
-        add_title_sample(video_id, title)
-    update_title_history(video_id, sorted(set(titles)), date.today())
+        return frozenset()
+    unique = frozenset(titles)
+    add_title_samples(video_id, titles)
+    update_title_history(video_id, sorted(unique), date.today())
+    return unique
+
+
+def _age_seconds(published_at: datetime) -> float:
+    """Seconds since publication. RSS dates are tz-aware; ones read back from
+    Postgres (or stamped for undated videos) are naive."""
+    return (datetime.now(published_at.tzinfo) - published_at).total_seconds()
 
 
 def process_video(video_id: str, channel_id: str, channel_name: str, published_at: datetime, fast_first: bool = True):
@@ -239,9 +300,10 @@ def process_video(video_id: str, channel_id: str, channel_name: str, published_a
                 parallel burst, then keep sampling and update the comment only if
                 new variants turn up.
     """
-    print(f"[{channel_name}] Processing {video_id} (published {published_at.date()})", flush=True)
+    logger.info("[%s] Processing %s (published %s)", channel_name, video_id, published_at.date())
 
-    new_video = not get_comment_id(video_id)
+    comment_id = get_comment_id(video_id)
+    new_video = not comment_id
 
     # FAST PATH: brand-new video -> sample a quick burst, then deepen. We only
     # actually post once >= 2 variants are seen (see _ensure_comment), so a video
@@ -250,38 +312,100 @@ def process_video(video_id: str, channel_id: str, channel_name: str, published_a
         try:
             quick = sample_titles(video_id, FAST_SAMPLES, parallel=True)
         except Exception as e:
-            print(f"[{channel_name}] ERROR sampling {video_id}: {e}", flush=True)
+            logger.error("[%s] ERROR sampling %s: %s", channel_name, video_id, e)
             quick = []
 
+        seen = frozenset()
         if quick:
-            _record_samples(video_id, quick)
-            _ensure_comment(video_id, channel_name)
+            seen = _record_samples(video_id, quick)
+            comment_id = _ensure_comment(video_id, channel_name, comment_id)
 
         # Deepen sampling, then post/update if a new variant turned up.
+        sampled = len(quick)
         remaining = max(0, SAMPLES_PER_RUN - FAST_SAMPLES)
+        if len(seen) == 1 and _age_seconds(published_at) > FAST_PATH_SKIP_STABLE_AGE:
+            remaining = 0  # one title on an already-old video: leave it to the hourly sweep
         if remaining:
             before = _distinct_titles(video_id)
-            _record_samples(video_id, sample_titles(video_id, remaining))
-            _ensure_comment(video_id, channel_name, before)
-
-        total = get_total_samples(video_id)
-        print(f"[{channel_name}] {video_id}: {total} samples, "
-              f"{len(get_title_stats(video_id))} distinct titles", flush=True)
+            deeper = sample_titles(video_id, remaining)
+            recorded = _record_samples(video_id, deeper)
+            _ensure_comment(video_id, channel_name, comment_id, before, recorded)
+            sampled += len(deeper)
+            seen = before | recorded
+
+        # Counted from this run's own data -- no extra queries just to log.
+        logger.info("[%s] %s: %d samples this run, %d distinct titles",
+                    channel_name, video_id, sampled, len(seen))
         return
 
     # FULL PATH: existing comment, or commenting disabled.
     before = None if new_video else _distinct_titles(video_id)
     titles = sample_titles(video_id, SAMPLES_PER_RUN)
     if not titles:
-        print(f"[{channel_name}] No titles found for {video_id}", flush=True)
+        logger.info("[%s] No titles found for %s", channel_name, video_id)
         return
-    _record_samples(video_id, titles)
+    recorded = _record_samples(video_id, titles)
+
+    logger.info("[%s] %s: %d samples this run, %d distinct titles",
+                channel_name, video_id, len(titles), len((before or frozenset()) | recorded))
+
+    _ensure_comment(video_id, channel_name, comment_id, before, recorded)
+
+
+def _is_short(video_id: str, flags: dict) -> bool:
+    """Whether a video is a Short, answered from ``flags`` (the stored
+    short_flags rows, preloaded per channel check with get_short_flags) when
+    this video was already classified. Only definitive probe results are
+    stored, so a failed probe is retried next time instead of pinning a short
+    as long-form. New results are added to ``flags`` too, so a video isn't
+    probed twice in one check."""
+    if video_id not in flags:
+        _classify_shorts([video_id], flags)
+    return flags.get(video_id, False)
+
+
+def _classify_shorts(video_ids: List[str], flags: dict) -> None:
+    """Probe every id not yet in ``flags`` concurrently, then store the
+    definitive answers in one write and add them to ``flags``. Ids whose probe
+    failed stay absent (treated as long-form, retried next check)."""
+    unknown = [v for v in video_ids if v not in flags]
+    if not unknown:
+        return
+    if len(unknown) == 1:
+        results = [probe_short(unknown[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=min(len(unknown), SHORTS_PROBE_WORKERS)) as ex:
+            results = list(ex.map(probe_short, unknown))
+    found = {v: flag for v, flag in zip(unknown, results) if flag is not None}
+    set_short_flags(found)
+    flags.update(found)
+
+
+class NewVideo(NamedTuple):
+    """A newly stored upload found by check_channel, in process_video's
+    argument order."""
+    video_id: str
+    channel_id: str
+    channel_name: str
+    published_at: datetime
 
-    total = get_total_samples(video_id)
-    print(f"[{channel_name}] {video_id}: {total} samples, "
-          f"{len(get_title_stats(video_id))} distinct titles", flush=True)
 
-    _ensure_comment(video_id, channel_name, before)
+# Adaptive new-video polling, per channel: channel_id -> (current interval,
+# time.monotonic() at which it is next due). Only touched from the scheduler
+# thread (check_new_videos), so no lock.
+_channel_poll_state: dict = {}
+
+# +/- fraction applied to each channel's next due time, so backed-off channels
+# drift apart instead of all coming due on the same tick and bursting together.
+_POLL_JITTER = 0.1
+
+
+def _next_poll_interval(current: float, found_new: bool) -> float:
+    """Back off 1.5x (capped at MAX_NEW_VIDEO_INTERVAL) after a quiet check;
+    reset to NEW_VIDEO_CHECK_INTERVAL as soon as the channel posts."""
+    if found_new:
+        return NEW_VIDEO_CHECK_INTERVAL
+    return max(NEW_VIDEO_CHECK_INTERVAL, min(current * 1.5, MAX_NEW_VIDEO_INTERVAL))
 
 
 def check_new_videos():
@@ -291,10 +415,17 @@ def check_new_videos():
     new videos IN PARALLEL. When new video found, spawn background task to
     process it immediately.
     """
-    print(f"\n=== Checking for new videos at {datetime.now()} ===")
+    logger.info("=== Checking for new videos ===")
+    # One timestamp per tick for undated (channel-page fallback) videos, so all
+    # of them found in the same check share it.
+    tick_dt = datetime.now()
+
+    def check_channel(channel_slug: str, channel_name: str, track_from_date,
+                      known_ids: frozenset) -> List[NewVideo]:
+        """Check single channel, return list of new videos to process.
 
-    def check_channel(channel_slug: str, channel_name: str, track_from_date) -> List[tuple]:
-        """Check single channel, return list of new videos to process."""
+        known_ids: the channel's newest known video ids, preloaded for the
+        whole tick (see get_known_video_id_sets)."""
         new_videos = []
         # Per-channel cutoff (set on add / resume) takes precedence; legacy
         # channels seeded before this existed fall back to the global cutoff.
@@ -307,8 +438,6 @@ def check_new_videos():
             # Check if we have dates (RSS) or not (HTTP fallback)
             has_dates = rss_videos[0][1] is not None
 
-            known_ids = set(get_known_video_ids_for_channel(channel_slug, limit=50))
-            
             if has_dates:
                 # RSS MODE: We have publish dates.
                 #
@@ -316,82 +445,95 @@ def check_new_videos():
                 # it in the RAW feed WITHOUT classifying shorts first: shorts are
                 # never stored, so a short can never match known_ids and can never
                 # be mistaken for the anchor. This lets us run the (expensive,
-                # 1-2 HTTP calls each) is_short() check only on the handful of
+                # 1-2 HTTP calls each) shorts probe only on the handful of
                 # genuinely-new candidates instead of on all ~50 feed items every
                 # cycle -- the difference between a few and thousands of extra
                 # requests per minute once many channels are tracked.
-                anchor_index = None
-                for i, (video_id, _) in enumerate(rss_videos):
+                #
+                # One pass: walk the feed newest-first, stop at the anchor, and
+                # keep only videos newer than it (before it in the list). The
+                # cheap date gate runs here too, BEFORE the costly shorts check:
+                # anything before this channel's cutoff (incl. a resumed
+                # channel's whole pause-window backlog) is dropped without a
+                # network call.
+                candidates = []
+                for video_id, published_at in rss_videos:
                     if video_id in known_ids:
-                        anchor_index = i
                         break
+                    if published_at.date() >= effective_cutoff:
+                        candidates.append((video_id, published_at))
+
+                # Stored classifications for everything we may probe below, in
+                # one query (the first-run anchor search walks the whole feed).
+                flags = get_short_flags(
+                    [v for v, _ in candidates] if known_ids else [v for v, _ in rss_videos]
+                )
 
-                # Only consider videos newer than the anchor (before it in the list).
-                candidates = rss_videos[:anchor_index] if anchor_index is not None else rss_videos
+                # Now pay for the shorts classification, only for new in-window
+                # videos -- all of them at once rather than one after another.
+                _classify_shorts([v for v, _ in candidates], flags)
 
                 processed_count = 0
                 for video_id, published_at in candidates:
-                    if video_id in known_ids:
-                        continue
-                    # Cheap date gate BEFORE the costly shorts check: anything
-                    # before this channel's cutoff (incl. a resumed channel's
-                    # whole pause-window backlog) is dropped without a network call.
-                    if published_at.date() < effective_cutoff:
-                        continue
-                    # Now pay for the shorts classification, only for new in-window videos.
-                    if is_short(video_id):
+                    if flags.get(video_id, False):
                         continue
                     if add_video(video_id, channel_slug, published_at):
-                        new_videos.append((video_id, channel_slug, channel_name, published_at))
+                        new_videos.append(NewVideo(video_id, channel_slug, channel_name, published_at))
                         processed_count += 1
-                        print(f"[{channel_name}] NEW VIDEO: {video_id} (published {published_at.date()})")
+                        logger.info("[%s] NEW VIDEO: %s (published %s)", channel_name, video_id, published_at.date())
 
                 # First run for this channel: make sure at least one long-form
                 # video is stored as an inactive anchor, so subsequent cycles have
                 # a reference point and never re-crawl the back catalogue.
                 if not known_ids and processed_count == 0:
                     for video_id, published_at in rss_videos:
-                        if not is_short(video_id):
+                        if not _is_short(video_id, flags):
                             add_video(video_id, channel_slug, published_at, is_active=False)
                             break
             
             else:
                 # HTTP MODE: No dates, already filtered to long-form only
-                # Find newest known video in the list
-                anchor_index = None
-                for i, (video_id, _) in enumerate(rss_videos):
-                    if video_id in known_ids:
-                        anchor_index = i
-                        break
+                # Anchor = position of the newest known video; everything
+                # before it in the list is newer.
+                anchor = next(
+                    (i for i, (video_id, _) in enumerate(rss_videos) if video_id in known_ids),
+                    None,
+                )
                 
-                if anchor_index is not None:
+                if anchor is not None:
                     # Only process videos newer than anchor (before it in list)
-                    candidates = rss_videos[:anchor_index]
-                    
-                    for video_id, _ in candidates:
-                        if video_id in known_ids:
-                            continue
-                        
-                        if add_video(video_id, channel_slug, datetime.now()):
-                            new_videos.append((video_id, channel_slug, channel_name, datetime.now()))
-                            print(f"[{channel_name}] NEW VIDEO: {video_id} (HTTP, no date)")
+                    for video_id, _ in rss_videos[:anchor]:
+                        if add_video(video_id, channel_slug, tick_dt):
+                            new_videos.append(NewVideo(video_id, channel_slug, channel_name, tick_dt))
+                            logger.info("[%s] NEW VIDEO: %s (HTTP, no date)", channel_name, video_id)
                 else:
                     # No anchor - first run via HTTP
                     # Store first video as anchor (inactive)
                     vid_id, _ = rss_videos[0]
-                    add_video(vid_id, channel_slug, datetime.now(), is_active=False)
+                    add_video(vid_id, channel_slug, tick_dt, is_active=False)
         
         except Exception as e:
-            print(f"[{channel_name}] Error checking channel: {e}", file=sys.stderr)
-            import traceback
-            traceback.print_exc()
+            logger.exception("[%s] Error checking channel: %s", channel_name, e)
         
         return new_videos
     
-    # Check all enabled channels (from Postgres) in parallel
-    channels = get_enabled_channels()
+    # Check all enabled channels (from Postgres) that are due, in parallel
+    tick = time.monotonic()
+    # Channels are only looked at once per tick, so count anything due before
+    # the middle of the next tick as due now -- otherwise a due time jittered a
+    # few seconds past this tick would wait a whole extra interval.
+    due_by = tick + NEW_VIDEO_CHECK_INTERVAL / 2
+    channels = [
+        ch for ch in get_enabled_channels()
+        if _channel_poll_state.get(ch["channel_id"], (0, 0))[1] <= due_by
+    ]
+    # Anchor sets for every due channel in one query, not one per channel.
+    known = get_known_video_id_sets([ch["channel_id"] for ch in channels], limit=50)
     futures = {
-        executor.submit(check_channel, ch["channel_id"], ch["display_name"], ch["track_from_date"]):
+        poll_executor.submit(
+            check_channel, ch["channel_id"], ch["display_name"], ch["track_from_date"],
+            known[ch["channel_id"]],
+        ):
             (ch["channel_id"], ch["display_name"])
         for ch in channels
     }
@@ -401,27 +543,34 @@ def check_new_videos():
         ch_slug, ch_name = futures[future]
         try:
             new_videos = future.result()
+            interval = _next_poll_interval(
+                _channel_poll_state.get(ch_slug, (NEW_VIDEO_CHECK_INTERVAL, 0))[0],
+                bool(new_videos),
+            )
+            jitter = random.uniform(1 - _POLL_JITTER, 1 + _POLL_JITTER)
+            _channel_poll_state[ch_slug] = (interval, tick + interval * jitter)
             if new_videos:
-                for video_id, channel_slug, channel_name, published_at in new_videos:
+                for video in new_videos:
                     # Process in background - don't block other channels
-                    executor.submit(process_video, video_id, channel_slug, channel_name, published_at)
-                    print(f"[{channel_name}] Spawned background task for {video_id}")
+                    executor.submit(process_video, *video)
+                    logger.info("[%s] Spawned background task for %s", video.channel_name, video.video_id)
         except Exception as e:
-            print(f"[{ch_name}] Channel check failed: {e}", file=sys.stderr)
-            import traceback
-            traceback.print_exc()
+            logger.exception("[%s] Channel check failed: %s", ch_name, e)
 
 
-def _check_one_active_video(video_info: dict, refresh_meta: bool = True) -> None:
+def _check_one_active_video(video_info: dict, refresh_meta: bool = True,
+                            stagnated: bool = False) -> None:
     """Body of the hourly per-video check, run concurrently across all active
     videos (see check_active_videos) rather than one at a time -- with a few
     hundred active videos across many channels, a sequential loop here could
-    run longer than ACTIVE_VIDEO_CHECK_INTERVAL and delay new-video checks,
-    since both run on the same scheduler thread.
+    run longer than ACTIVE_VIDEO_CHECK_INTERVAL.
 
     refresh_meta: whether to also poll the comment's engagement metrics this
     pass (1 Data API unit each). Sampling + comment posting/editing always run;
-    only this metrics poll is gated to a slower cadence."""
+    only this metrics poll is gated to a slower cadence.
+
+    stagnated: whether the sweep's get_stagnated_video_ids found this video
+    stuck on one title for INACTIVE_DAYS_THRESHOLD days."""
     video_id = video_info["video_id"]
     channel_name = video_info.get("channel_name") or video_info["channel_id"]
 
@@ -429,8 +578,9 @@ def _check_one_active_video(video_info: dict, refresh_meta: bool = True) -> None
         # Stagnated (same single title for N days straight) -> stop tracking.
         # The comment already reflects the latest titles from prior checks, so
         # there's nothing new to post here.
-        if not is_video_active(video_id, INACTIVE_DAYS_THRESHOLD):
-            print(f"[{channel_name}] {video_id} stagnated ({INACTIVE_DAYS_THRESHOLD}+ days) - marking inactive")
+        if stagnated:
+            logger.info("[%s] %s stagnated (%d+ days) - marking inactive",
+                        channel_name, video_id, INACTIVE_DAYS_THRESHOLD)
             mark_video_inactive(video_id)
             return
 
@@ -441,110 +591,187 @@ def _check_one_active_video(video_info: dict, refresh_meta: bool = True) -> None
         # pushes the video to >= 2 distinct titles, otherwise it updates. This
         # (posting/editing on a new variant) is NEVER throttled -- it runs every
         # hour and is the timely part.
-        before = _distinct_titles(video_id)
+        # Distinct titles so far come with the sweep's snapshot (one query
+        # for all videos) rather than a per-video lookup here.
+        before = frozenset(video_info["titles"])
         titles = sample_titles(video_id, SAMPLES_PER_RUN, parallel=True)
         if not titles:
             return
-        _record_samples(video_id, titles)
-        _ensure_comment(video_id, channel_name, before)
+        recorded = _record_samples(video_id, titles)
+        # The sweep's snapshot already carries comment_id; only comment-less
+        # videos are re-read, since a process_video task may have posted since
+        # the snapshot and a stale None here would mean a duplicate comment.
+        comment_id = video_info.get("comment_id") or get_comment_id(video_id)
+        comment_id = _ensure_comment(video_id, channel_name, comment_id, before, recorded)
 
         # Engagement/status refresh (likes, replies, held->published) costs 1
         # Data API unit per comment and does NOT affect posting -- so it runs on
         # a slower cadence (refresh_meta) to keep the daily quota in check at
         # scale, rather than every hourly pass.
-        if refresh_meta:
-            cid = get_comment_id(video_id)
-            if cid:
-                meta = fetch_comment_meta(cid)
-                if meta:
-                    update_comment_meta(video_id, meta["status"], meta["likes"], meta["replies"])
+        if refresh_meta and comment_id:
+            meta = fetch_comment_meta(comment_id)
+            if meta:
+                update_comment_meta(video_id, meta["status"], meta["likes"], meta["replies"])
 
     except Exception as e:
-        print(f"Error checking video {video_id}: {e}", file=sys.stderr)
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error checking video %s: %s", video_id, e)
+
 
+_sweep_thread: Optional[threading.Thread] = None
 
-def check_active_videos(refresh_meta: bool = True):
+
+def check_active_videos(refresh_meta: bool = True) -> bool:
     """Check active videos for title changes (hourly task).
 
     Videos are already filtered by is_active = TRUE in the database.
     If a video has stagnated (same single title for N days), mark it inactive permanently.
 
-    Runs across the shared executor (same pattern as check_new_videos) so the
-    sweep finishes in roughly one video's worth of wall-clock time instead of
-    len(active_videos) times that -- necessary once many channels/videos are
-    tracked, since this and check_new_videos share the scheduler's main thread.
+    Only the snapshot queries run here; the videos themselves are fed to the
+    processing executor from a background thread (same pattern as the startup
+    reprocess), so the scheduler thread returns at once and new-video checks
+    keep running on schedule while the sweep is in progress.
 
     refresh_meta: forwarded per-video; when False this pass samples + posts/edits
     comments as usual but skips the engagement-metric API poll (see the scheduler
     loop, which only enables it every META_REFRESH_INTERVAL).
+
+    Returns False (and does nothing) if the previous sweep is still running.
     """
-    print(f"\n=== Checking active videos at {datetime.now()} (refresh_meta={refresh_meta}) ===")
+    global _sweep_thread
+    if _sweep_thread is not None and _sweep_thread.is_alive():
+        logger.warning("Previous active-video sweep still running - skipping this one")
+        return False
+
+    logger.info("=== Checking active videos (refresh_meta=%s) ===", refresh_meta)
 
     active_videos = get_active_videos()
-    print(f"Found {len(active_videos)} active videos to check")
+    stagnated = get_stagnated_video_ids(INACTIVE_DAYS_THRESHOLD)
+    logger.info("Found %d active videos to check", len(active_videos))
 
-    futures = [executor.submit(_check_one_active_video, v, refresh_meta) for v in active_videos]
+    _sweep_thread = threading.Thread(
+        target=_submit_sweep, args=(active_videos, stagnated, refresh_meta),
+        name="sweep", daemon=True,
+    )
+    _sweep_thread.start()
+    return True
+
+
+def _submit_sweep(active_videos: List[dict], stagnated: set, refresh_meta: bool) -> None:
+    # At most SWEEP_CONCURRENCY videos are handed to the executor at a time, so
+    # the sweep never fills the pool (or its queue): a new upload's
+    # process_video still gets a worker promptly mid-sweep.
+    slots = threading.BoundedSemaphore(SWEEP_CONCURRENCY)
+    futures = []
+    for video_info in active_videos:
+        slots.acquire()
+        if _stop_event.is_set():
+            break
+        future = executor.submit(
+            _check_one_active_video, video_info, refresh_meta,
+            video_info["video_id"] in stagnated,
+        )
+        future.add_done_callback(lambda _f: slots.release())
+        futures.append(future)
     for future in as_completed(futures):
-        future.result()  # exceptions are already caught/logged inside; re-raise only bugs in the wrapper itself
+        if future.cancelled():
+            continue  # dropped by the executor shutdown on Ctrl-C
+        try:
+            future.result()  # per-video errors are already caught/logged inside
+        except Exception:
+            logger.exception("Active-video check failed")
+    logger.info("Active-video sweep finished (%d videos)", len(futures))
 
 
-def run_scheduler():
-    """Run the main scheduler loop."""
-    print("Initializing database...")
+def bootstrap_scheduler():
+    """One-time startup work before the polling loop: schema, channel seed, and
+    a retry pass over videos whose first comment never landed."""
+    logger.info("Initializing database...")
     init_db()
 
     # Seed channels from the env-var list on first boot only -- this never
     # overwrites a channel that already exists (see seed_channel_if_missing),
     # so it's safe to leave YOUTUBE_CHANNELS set permanently. From here on,
     # Postgres (managed via the admin UI) is the source of truth.
-    for ch_id, ch_name in CHANNELS:
+    for ch_id, ch_name in get_channels():
         seed_channel_if_missing(ch_id, ch_name)
 
     # Reprocess any videos that have no comments (from failed earlier runs)
     reprocess_videos_without_comments()
 
+
+def scheduler_loop():
+    """Run the new-video / active-video checks on their intervals until
+    stop_scheduler() is called."""
     enabled_count = len(get_enabled_channels())
-    print(f"Starting scheduler:")
-    print(f"  - New video check: every {NEW_VIDEO_CHECK_INTERVAL}s")
-    print(f"  - Active video check: every {ACTIVE_VIDEO_CHECK_INTERVAL}s")
-    print(f"  - Channels enabled: {enabled_count}")
-    print(f"  - Fallback cutoff date (legacy channels only): {CUTOFF_DATE}")
-    print(f"  - Inactive threshold: {INACTIVE_DAYS_THRESHOLD} days")
-    print(f"  - Scheduler workers: {SCHEDULER_WORKERS}")
+    logger.info("Starting scheduler:")
+    logger.info("  - New video check: every %ds", NEW_VIDEO_CHECK_INTERVAL)
+    logger.info("  - Active video check: every %ds", ACTIVE_VIDEO_CHECK_INTERVAL)
+    logger.info("  - Channels enabled: %d", enabled_count)
+    logger.info("  - Fallback cutoff date (legacy channels only): %s", CUTOFF_DATE)
+    logger.info("  - Inactive threshold: %d days", INACTIVE_DAYS_THRESHOLD)
+    logger.info("  - Scheduler workers: %d (+%d for channel polls)", SCHEDULER_WORKERS, POLL_WORKERS)
     
-    last_new_check = 0
-    last_active_check = time.time()  # Don't run hourly check immediately on startup
-    last_meta_check = 0  # Refresh engagement metrics on the first active sweep
+    last_meta_check = None  # Refresh engagement metrics on the first active sweep
+
+    def active_sweep():
+        # Sampling + comment posting/editing run every ACTIVE_VIDEO_CHECK_INTERVAL,
+        # but the (1 Data API unit each) engagement-metric poll only piggybacks
+        # on this sweep every META_REFRESH_INTERVAL -- keeping the daily quota in
+        # check at scale.
+        nonlocal last_meta_check
+        now = time.monotonic()
+        refresh_meta = last_meta_check is None or now - last_meta_check >= META_REFRESH_INTERVAL
+        started = check_active_videos(refresh_meta=refresh_meta)
+        if refresh_meta and started:
+            last_meta_check = now
+
+    # Min-heap of (deadline, tiebreak, interval, job). The thread parks until the
+    # earliest deadline instead of waking every few seconds to compare clocks,
+    # and monotonic time keeps wall-clock jumps from firing or stalling jobs.
+    start = time.monotonic()
+    jobs = [
+        (start, 0, NEW_VIDEO_CHECK_INTERVAL, check_new_videos),
+        # Don't run the hourly check immediately on startup
+        (start + ACTIVE_VIDEO_CHECK_INTERVAL, 1, ACTIVE_VIDEO_CHECK_INTERVAL, active_sweep),
+    ]
+    heapq.heapify(jobs)
+
+    while not _stop_event.is_set():
+        deadline, tiebreak, interval, job = heapq.heappop(jobs)
+        if _stop_event.wait(max(0.0, deadline - time.monotonic())):
+            break
+        started = time.monotonic()
+        try:
+            job()
+        except Exception:
+            # e.g. Postgres briefly unreachable while listing channels/videos.
+            # Log and keep the schedule -- an escaped exception here would
+            # silently end the scheduler thread under gunicorn.
+            logger.exception("Scheduled job %s failed", job.__name__)
+        heapq.heappush(jobs, (started + interval, tiebreak, interval, job))
+
+
+def stop_scheduler():
+    """Ask scheduler_loop to return (it wakes immediately rather than at the
+    next deadline)."""
+    _stop_event.set()
 
+
+def run_scheduler():
+    """Run the main scheduler: bootstrap once, then loop."""
+    bootstrap_scheduler()
     try:
-        while True:
-            now = time.time()
-
-            # Check for new videos
-            if now - last_new_check >= NEW_VIDEO_CHECK_INTERVAL:
-                check_new_videos()
-                last_new_check = now
-
-            # Check active videos. Sampling + comment posting/editing run every
-            # ACTIVE_VIDEO_CHECK_INTERVAL, but the (1 Data API unit each)
-            # engagement-metric poll only piggybacks on this sweep every
-            # META_REFRESH_INTERVAL -- keeping the daily quota in check at scale.
-            if now - last_active_check >= ACTIVE_VIDEO_CHECK_INTERVAL:
-                refresh_meta = now - last_meta_check >= META_REFRESH_INTERVAL
-                check_active_videos(refresh_meta=refresh_meta)
-                last_active_check = now
-                if refresh_meta:
-                    last_meta_check = now
-
-            # Sleep for a short time to avoid busy loop
-            time.sleep(10)
-    
+        scheduler_loop()
     except KeyboardInterrupt:
-        print("\nShutting down scheduler...")
+        logger.info("Shutting down scheduler...")
+        stop_scheduler()
+        # Drop queued sampling/poll tasks instead of draining a possibly long
+        # backlog on Ctrl-C; tasks already running finish on their own.
+        for pool in (poll_executor, executor):
+            pool.shutdown(wait=False, cancel_futures=True)
         sys.exit(0)
 
 
 if __name__ == "__main__":
+    setup_logging()
     run_scheduler()
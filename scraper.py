@@ -1,22 +1,57 @@
 """Fetch videos from channel using RSS (primary) with channel page scrape fallback."""
+import html as html_lib
+import http.cookiejar
+import io
+import logging
+import random
 import re
 import time
 from datetime import datetime
 from typing import List, Optional, Tuple
 import xml.etree.ElementTree as ET
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from youtube_comment import get_credentials
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+from config import POLL_WORKERS, SCHEDULER_WORKERS
+from youtube_comment import get_service
 
 import youtube_innertube
 
+logger = logging.getLogger(__name__)
+
 RSS_URL = "https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
 WATCH_URL = "https://www.youtube.com/watch?v={video_id}"
 SHORTS_URL = "https://www.youtube.com/shorts/{video_id}"
 
 _CHANNEL_ID_RE = re.compile(r"^UC[A-Za-z0-9_-]{22}$")
+# Handle-page scraping: the channel's own id and display name.
+_EXTERNAL_ID_RE = re.compile(r'"externalId":"(UC[a-zA-Z0-9_-]{22})"')
+_OG_TITLE_RE = re.compile(r'<meta property="og:title" content="([^"]+)"')
+# Channel-page video ids, and the shorts probe's og:url (a bytes pattern: it
+# runs on the raw page head, with no decode/lowercase pass first).
+_VIDEO_ID_RE = re.compile(r'"videoId":"([a-zA-Z0-9_-]{11})"')
+_OG_URL_RE = re.compile(
+    rb'<meta\s+property=["\']og:url["\']\s+content=["\']([^"\']+)["\']', re.IGNORECASE
+)
+# Watch-page title, most reliable first (see _parse_title_from_html). The meta
+# and <title> patterns only ever match inside <head>; the embedded-JSON ones
+# live in the body.
+_HEAD_TITLE_PATTERNS = (
+    # 1. og:title (double-quoted)
+    re.compile(r'<meta\s+property="og:title"\s+content="([^"]+)"'),
+    # 2. og:title (content first, or single quotes)
+    re.compile(r'<meta\s+content="([^"]+)"\s+property="og:title"'),
+    re.compile(r"<meta\s+property=['\"]og:title['\"]\s+content=['\"]([^'\"]+)['\"]"),
+    # 3. <title>... - YouTube</title>
+    re.compile(r"<title>([^<]+)\s*-\s*YouTube</title>", re.IGNORECASE | re.DOTALL),
+)
+_BODY_TITLE_PATTERNS = (
+    # 4. Embedded JSON: "runs":[{"text":"Title here"}] (videoPrimaryInfoRenderer)
+    re.compile(r'"runs":\s*\[\s*\{\s*"text":\s*"((?:[^"\\]|\\.)*)"'),
+    # 5. "simpleText":"Title"
+    re.compile(r'"simpleText":\s*"((?:[^"\\]|\\.)*)"'),
+)
 
 
 def _looks_like_channel_id(value: str) -> bool:
@@ -30,9 +65,40 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.9",
 }
 
+# Watch-page fetch for the shorts probe: only the first 50KB (<head>) is read.
+_WATCH_HEAD_HEADERS = {**HEADERS, "Range": "bytes=0-51199"}
+
+# One keep-alive session for all scraper traffic (RSS feeds, handle pages,
+# shorts probes, watch pages) so repeated requests to youtube.com reuse pooled
+# TLS connections instead of handshaking per call. Cookies are refused: the
+# watch-page title fallback relies on every request looking like a fresh viewer
+# (see youtube_innertube), and nothing else here needs session state. The pool
+# is sized for the worst case of POLL_WORKERS channel checks each probing
+# SHORTS_PROBE_WORKERS shorts in parallel, plus every SCHEDULER_WORKERS thread
+# in the watch-page title fallback at once; a smaller pool (requests' default
+# is 10 per host) would discard and re-handshake connections under that load.
+# Failures to connect (DNS blip, refused, connect timeout) get two quick
+# retries -- nothing was sent, so that's always safe. Read errors and HTTP
+# statuses are left to the callers, which all have their own fallbacks.
+SHORTS_PROBE_WORKERS = 8  # max concurrent probe_short calls per channel check
+_session = requests.Session()
+_session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+_session.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=POLL_WORKERS * SHORTS_PROBE_WORKERS + SCHEDULER_WORKERS,
+    max_retries=Retry(total=2, read=False, status=False, backoff_factor=0.3),
+))
+
 # Cache for handle -> channel_id resolution
 _handle_to_channel_id_cache = {}
 
+# Handles whose page loaded but carried no channel id: handle -> time.monotonic()
+# of that answer. Skipped for a while so a dead handle costs one fetch per TTL
+# (its polls go straight to the channel-page fallback) instead of one per poll.
+# Network errors aren't cached -- those are retried next time.
+_UNRESOLVED_HANDLE_TTL = 600.0
+_unresolved_handles = {}
+
 
 def _resolve_handle_to_channel_id(handle: str, expected_name: str = None) -> Optional[str]:
     """
@@ -51,85 +117,107 @@ def _resolve_handle_to_channel_id(handle: str, expected_name: str = None) -> Opt
     
     if handle in _handle_to_channel_id_cache:
         return _handle_to_channel_id_cache[handle]
+    missed_at = _unresolved_handles.get(handle)
+    if missed_at is not None and time.monotonic() - missed_at < _UNRESOLVED_HANDLE_TTL:
+        return None
     
     url = f"https://www.youtube.com/{handle}"
     
     try:
-        r = requests.get(url, headers=HEADERS, timeout=15)
+        r = _session.get(url, headers=HEADERS, timeout=15)
         r.raise_for_status()
         html = r.text
         
         # Use externalId - most reliable channel ID extraction
-        match = re.search(r'"externalId":"(UC[a-zA-Z0-9_-]{22})"', html)
+        match = _EXTERNAL_ID_RE.search(html)
         
         if match:
             channel_id = match.group(1)
             
             # Validate channel name if provided
             if expected_name:
-                og_match = re.search(r'<meta property="og:title" content="([^"]+)"', html)
+                og_match = _OG_TITLE_RE.search(html)
                 if og_match:
                     found_name = og_match.group(1)
                     # Loose match
                     if expected_name.lower() not in found_name.lower() and found_name.lower() not in expected_name.lower():
-                        print(f"WARNING: Channel name mismatch for {handle}: expected '{expected_name}', found '{found_name}'")
+                        logger.warning("Channel name mismatch for %s: expected '%s', found '%s'", handle, expected_name, found_name)
             
             _handle_to_channel_id_cache[handle] = channel_id
+            _unresolved_handles.pop(handle, None)
             return channel_id
+        _unresolved_handles[handle] = time.monotonic()
             
     except Exception as e:
-        print(f"Failed to resolve handle {handle}: {e}")
+        logger.warning("Failed to resolve handle %s: %s", handle, e)
     
     return None
 
 
+# Feed element tags, fully qualified (yt: and Atom namespaces).
+_ATOM_ENTRY = "{http://www.w3.org/2005/Atom}entry"
+_ATOM_PUBLISHED = "{http://www.w3.org/2005/Atom}published"
+_YT_VIDEO_ID = "{http://www.youtube.com/xml/schemas/2015}videoId"
+
+# Conditional-GET state per feed: channel_id -> (ETag, Last-Modified, parsed
+# videos). A 304 reuses the last parse, so an unchanged feed costs a header-only
+# round-trip and no XML work. In-memory only: after a restart the first fetch of
+# each feed is simply unconditional again.
+_rss_validators = {}
+
+
 def _get_videos_from_rss(channel_id: str, max_videos: int = 50) -> List[Tuple[str, datetime]]:
     """Try RSS feed first (free, no quota)."""
     url = RSS_URL.format(channel_id=channel_id)
-    r = requests.get(url, headers=HEADERS, timeout=15)
+    headers = HEADERS
+    cached = _rss_validators.get(channel_id)
+    if cached:
+        etag, last_modified, _ = cached
+        headers = dict(HEADERS)
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    r = _session.get(url, headers=headers, timeout=15)
+    if r.status_code == 304 and cached:
+        return cached[2][:max_videos]
     r.raise_for_status()
-    root = ET.fromstring(r.text)
-    
-    ns = {"yt": "http://www.youtube.com/xml/schemas/2015", "atom": "http://www.w3.org/2005/Atom"}
-    entries = root.findall(".//atom:entry", namespaces=ns)
-    if not entries:
-        entries = root.findall(".//{http://www.w3.org/2005/Atom}entry")
-    
+
+    # Parse the (already downloaded) body incrementally: handle each <entry> as
+    # its parser "end" event fires, reading its direct children by fully-
+    # qualified tag, and stop parsing once we have max_videos -- no whole-
+    # document tree, no namespace-map subtree searches.
     videos = []
-    for entry in entries[:max_videos]:
-        video_id_elem = entry.find(".//yt:videoId", namespaces=ns)
-        if video_id_elem is None:
-            video_id_elem = entry.find(".//{http://www.youtube.com/xml/schemas/2015}videoId")
-        if video_id_elem is None:
+    for _, entry in ET.iterparse(io.BytesIO(r.content)):
+        if entry.tag != _ATOM_ENTRY:
             continue
-        
-        video_id = (video_id_elem.text or "").strip()
-        if not video_id:
+        video_id = (entry.findtext(_YT_VIDEO_ID) or "").strip()
+        published_str = (entry.findtext(_ATOM_PUBLISHED) or "").strip()
+        entry.clear()
+        if not video_id or not published_str:
             continue
-        
-        published_elem = entry.find(".//atom:published", namespaces=ns)
-        if published_elem is None:
-            published_elem = entry.find(".//{http://www.w3.org/2005/Atom}published")
-        
-        if published_elem is not None and published_elem.text:
-            try:
-                published_str = published_elem.text.strip()
-                published_at = datetime.fromisoformat(published_str.replace("Z", "+00:00"))
-                videos.append((video_id, published_at))
-            except (ValueError, AttributeError):
-                continue
+        try:
+            published_at = datetime.fromisoformat(published_str)
+        except ValueError:
+            continue
+        videos.append((video_id, published_at))
+        if len(videos) >= max_videos:
+            break
     
+    etag, last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+    if videos and (etag or last_modified):
+        _rss_validators[channel_id] = (etag, last_modified, videos)
+    else:
+        _rss_validators.pop(channel_id, None)
     return videos
 
 
 def _get_videos_from_api(channel_id: str, max_videos: int = 50) -> List[Tuple[str, datetime]]:
     """Fallback to YouTube Data API (costs quota)."""
-    creds = get_credentials()
-    if not creds:
+    youtube = get_service()
+    if youtube is None:
         return []
     
-    youtube = build("youtube", "v3", credentials=creds)
-    
     # Uploads playlist ID = "UU" + channel_id without "UC" prefix
     uploads_playlist_id = "UU" + channel_id[2:]
     
@@ -152,7 +240,7 @@ def _get_videos_from_api(channel_id: str, max_videos: int = 50) -> List[Tuple[st
             
             if video_id and published_str:
                 try:
-                    published_at = datetime.fromisoformat(published_str.replace("Z", "+00:00"))
+                    published_at = datetime.fromisoformat(published_str)
                     videos.append((video_id, published_at))
                 except (ValueError, AttributeError):
                     continue
@@ -178,21 +266,21 @@ def _get_videos_from_channel_page(handle: str, max_videos: int = 15) -> List[Tup
     url = f"https://www.youtube.com/{handle}/videos"
     
     try:
-        r = requests.get(url, headers=HEADERS, timeout=15)
+        r = _session.get(url, headers=HEADERS, timeout=15)
         r.raise_for_status()
         html = r.text
         
         # Validate we're on a channel page using externalId
         if '"externalId":"UC' not in html:
-            print(f"WARNING: {handle}/videos did not resolve to a channel")
+            logger.warning("%s/videos did not resolve to a channel", handle)
             return []
         
-        # Extract video IDs from the page
-        video_ids = re.findall(r'"videoId":"([a-zA-Z0-9_-]{11})"', html)
-        # Dedupe while preserving order
+        # Extract video IDs from the page, deduped in order; finditer lets us
+        # stop as soon as we have max_videos instead of collecting every match
         seen = set()
         unique_ids = []
-        for vid in video_ids:
+        for m in _VIDEO_ID_RE.finditer(html):
+            vid = m.group(1)
             if vid not in seen:
                 seen.add(vid)
                 unique_ids.append(vid)
@@ -202,7 +290,7 @@ def _get_videos_from_channel_page(handle: str, max_videos: int = 15) -> List[Tup
         return [(vid, None) for vid in unique_ids]
     
     except Exception as e:
-        print(f"Channel page scrape failed for {handle}: {e}")
+        logger.warning("Channel page scrape failed for %s: %s", handle, e)
         return []
 
 
@@ -244,12 +332,12 @@ def get_videos_from_rss(handle: str, expected_name: str = None, max_videos: int
         channel_id = _resolve_handle_to_channel_id(handle, expected_name)
     
     if not channel_id:
-        print(f"Could not resolve {handle} to channel ID, trying channel page directly...")
+        logger.info("Could not resolve %s to channel ID, trying channel page directly...", handle)
         videos = _get_videos_from_channel_page(handle, max_videos)
         if videos:
-            print(f"Channel page scrape succeeded for {handle}")
+            logger.info("Channel page scrape succeeded for %s", handle)
             return videos
-        print(f"All methods failed for {handle}")
+        logger.error("All methods failed for %s", handle)
         return []
     
     # Try RSS first (free, has publish dates)
@@ -258,95 +346,89 @@ def get_videos_from_rss(handle: str, expected_name: str = None, max_videos: int
         if videos:
             return videos
     except Exception as e:
-        print(f"RSS failed for {handle} ({channel_id}): {e}, trying channel page...")
+        logger.warning("RSS failed for %s (%s): %s, trying channel page...", handle, channel_id, e)
     
     # Fallback: scrape channel page (free, no publish dates)
     videos = _get_videos_from_channel_page(handle, max_videos)
     if videos:
-        print(f"Channel page scrape succeeded for {handle}")
+        logger.info("Channel page scrape succeeded for %s", handle)
         return videos
     
-    print(f"All methods failed for {handle}")
+    logger.error("All methods failed for %s", handle)
     return []
 
 
-def is_short(video_id: str) -> bool:
+def probe_short(video_id: str) -> Optional[bool]:
     """
     Check if a video is a YouTube Short (efficient: tries lightest methods first).
     RSS feed doesn't tell us, so we need to check the video itself.
+
+    Returns True/False when a probe actually answered, or None when neither
+    request got through (network error / non-2xx) -- callers that persist the
+    answer must not store None as "long-form".
     """
+    answered = False
     try:
         # Method 1: Try HEAD request to shorts URL (lightest check)
-        # If video is a Short, /shorts/{id} stays as /shorts/{id}
+        # If video is a Short, /shorts/{id} answers 200 directly
         # If video is long-form, /shorts/{id} redirects to /watch?v={id}
+        # The first hop already says which, so don't follow the redirect.
         shorts_url = SHORTS_URL.format(video_id=video_id)
-        r_head = requests.head(shorts_url, headers=HEADERS, timeout=5, allow_redirects=True)
-        if r_head.ok:
-            # Check if FINAL URL (after redirects) still contains /shorts/
-            # Long-form videos redirect to /watch?v=, Shorts stay at /shorts/
-            if '/shorts/' in r_head.url.lower():
+        r_head = _session.head(shorts_url, headers=HEADERS, timeout=5, allow_redirects=False)
+        if r_head.status_code == 200:
+            return True
+        if r_head.is_redirect:
+            location = r_head.headers.get("Location", "").lower()
+            if '/shorts/' in location:
                 return True
+            if '/watch' in location:
+                return False
+            # Anything else (e.g. a consent-page redirect) proves nothing;
+            # fall through to the watch-page check.
         
         # Method 2: Check og:url meta tag from watch page (partial fetch, often cached)
-        # We only need to check the <head> section, but requests.get gets full page
-        # Still more efficient than checking full HTML content
+        # Only the <head> section is needed. Ask for just the first 50KB with a
+        # Range header (200 or 206 both fine); the page is dynamic, so the
+        # server may ignore it and send everything -- hence still streaming
+        # and stopping at 50KB ourselves either way.
         url = WATCH_URL.format(video_id=video_id)
-        r = requests.get(url, headers=HEADERS, timeout=10, stream=True)
-        if r.ok:
-            # Read first 50KB to get <head> section with og:url
-            content = b""
-            for chunk in r.iter_content(chunk_size=8192):
-                content += chunk
-                if len(content) > 50000:  # Stop after 50KB (enough for <head>)
-                    break
-            
-            html = content.decode('utf-8', errors='ignore').lower()
-            
+        # The with-block closes the streamed response on every path (including
+        # non-2xx), so a full-page body is never left half-read on the socket.
+        content = bytearray()
+        with _session.get(url, headers=_WATCH_HEAD_HEADERS, timeout=10, stream=True) as r:
+            if r.ok:
+                answered = True
+                # Read first 50KB to get <head> section with og:url
+                for chunk in r.iter_content(chunk_size=8192):
+                    content += chunk  # in-place extend, no re-copy per chunk
+                    if len(content) > 50000:  # Stop after 50KB (enough for <head>)
+                        break
+        if answered:
             # Check og:url meta tag first (most reliable indicator)
-            og_url_match = re.search(
-                r'<meta\s+property=["\']og:url["\']\s+content=["\']([^"\']+)["\']',
-                html,
-                re.IGNORECASE
-            )
-            if og_url_match and '/shorts/' in og_url_match.group(1).lower():
+            og_url_match = _OG_URL_RE.search(content)
+            if og_url_match and b'/shorts/' in og_url_match.group(1).lower():
                 return True
             
             # Check for shorts indicators in the partial HTML
-            if '"isShorts":true' in html or '"isShort":true' in html:
+            if b'"isShorts":true' in content or b'"isShort":true' in content:
                 return True
         
     except Exception:
         pass
     
-    return False
+    return False if answered else None
 
 
 def _parse_title_from_html(html: str) -> Optional[str]:
     """Try several patterns to get title from watch page HTML."""
-    import html as html_lib
-    # 1. og:title (double-quoted)
-    m = re.search(r'<meta\s+property="og:title"\s+content="([^"]+)"', html)
-    if m:
-        return html_lib.unescape(m.group(1).strip())
-    # 2. og:title (content first, or single quotes)
-    m = re.search(r'<meta\s+content="([^"]+)"\s+property="og:title"', html)
-    if m:
-        return html_lib.unescape(m.group(1).strip())
-    m = re.search(r"<meta\s+property=['\"]og:title['\"]\s+content=['\"]([^'\"]+)['\"]", html)
-    if m:
-        return html_lib.unescape(m.group(1).strip())
-    # 3. <title>... - YouTube</title>
-    m = re.search(r"<title>([^<]+)\s*-\s*YouTube</title>", html, re.IGNORECASE | re.DOTALL)
-    if m:
-        return html_lib.unescape(m.group(1).strip())
-    # 4. Embedded JSON: "runs":[{"text":"Title here"}] (videoPrimaryInfoRenderer)
-    m = re.search(r'"runs":\s*\[\s*\{\s*"text":\s*"((?:[^"\\]|\\.)*)"', html)
-    if m:
-        return html_lib.unescape(m.group(1).strip())
-    # 5. "simpleText":"Title"
-    m = re.search(r'"simpleText":\s*"((?:[^"\\]|\\.)*)"', html)
-    if m:
-        return html_lib.unescape(m.group(1).strip())
+    # The page is ~1MB; the head-only patterns scan just the <head>.
+    head_end = html.find("</head>")
+    head = html if head_end == -1 else html[:head_end]
+    for patterns, text in ((_HEAD_TITLE_PATTERNS, head), (_BODY_TITLE_PATTERNS, html)):
+        for pattern in patterns:
+            m = pattern.search(text)
+            if m:
+                return html_lib.unescape(m.group(1).strip())
     return None
 
 
@@ -354,7 +436,7 @@ def _scrape_title_via_html(video_id: str) -> Optional[str]:
     """Last-resort title fetch via watch-page HTML, then noembed."""
     url = WATCH_URL.format(video_id=video_id)
     try:
-        r = requests.get(url, headers=HEADERS, timeout=15)
+        r = _session.get(url, headers=HEADERS, timeout=15)
         r.raise_for_status()
         title = _parse_title_from_html(r.text)
         if title:
@@ -363,7 +445,7 @@ def _scrape_title_via_html(video_id: str) -> Optional[str]:
         pass
     try:
         noembed_url = f"https://noembed.com/embed?url=https://www.youtube.com/watch?v={video_id}"
-        r = requests.get(noembed_url, headers=HEADERS, timeout=10)
+        r = _session.get(noembed_url, headers=HEADERS, timeout=10)
         if r.ok:
             data = r.json()
             if isinstance(data.get("title"), str):
@@ -399,10 +481,13 @@ def sample_titles(video_id: str, count: int, delay: float = 0.8, parallel: bool
     # InnerTube returned nothing (host blocked / endpoint down): fall back to a
     # few HTML scrapes so we at least record the current title.
     fallback = []
-    for i in range(min(count, 5)):
+    attempts = min(count, 5)
+    for i in range(attempts):
         title = _scrape_title_via_html(video_id)
         if title:
             fallback.append(title)
-        if i < count - 1:
-            time.sleep(delay)
+        if i < attempts - 1:
+            # Jittered like the InnerTube loop, so parallel sweeps don't fall
+            # into lockstep against the watch page.
+            time.sleep(delay * random.uniform(0.5, 1.5))
     return fallback
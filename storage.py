@@ -1,19 +1,23 @@
 """PostgreSQL storage for channels, videos, title samples, and comments."""
 import os
+import threading
+import time
+from contextlib import contextmanager
 from datetime import date, datetime
 from typing import List, Optional, Tuple
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 from psycopg2.pool import ThreadedConnectionPool
 
-from config import DATABASE_URL, DB_POOL_MAX, RATIO_WINDOW_DAYS, SCHEDULER_WORKERS
+from config import DATABASE_URL, DB_POOL_MAX, POLL_WORKERS, RATIO_WINDOW_DAYS, SCHEDULER_WORKERS
 
 # Connection pool. MUST be the *threaded* pool: the scheduler runs many worker
 # threads and Flask serves requests on its own threads, all sharing this pool.
 # SimpleConnectionPool is documented as NOT thread-safe (its internal state can
 # corrupt under concurrent getconn/putconn), so it was the wrong choice here.
 _pool: Optional[ThreadedConnectionPool] = None
+_pool_lock = threading.Lock()
 
 
 def get_pool():
@@ -22,14 +26,22 @@ def get_pool():
     Sized so maxconn comfortably exceeds the scheduler's worker count plus a
     margin for concurrent Flask requests -- otherwise getconn() raises
     "connection pool exhausted" once demand crosses the ceiling.
+
+    Created under a lock (the scheduler and the first API requests can race
+    here at startup, and a loser would leak a whole pool of connections);
+    every later call is just the unlocked read.
     """
     global _pool
-    if _pool is None:
-        if not DATABASE_URL:
-            raise ValueError("DATABASE_URL not set")
-        maxconn = max(DB_POOL_MAX, SCHEDULER_WORKERS + 8)
-        _pool = ThreadedConnectionPool(2, maxconn, DATABASE_URL)
-    return _pool
+    pool = _pool
+    if pool is not None:
+        return pool
+    with _pool_lock:
+        if _pool is None:
+            if not DATABASE_URL:
+                raise ValueError("DATABASE_URL not set")
+            maxconn = max(DB_POOL_MAX, SCHEDULER_WORKERS + POLL_WORKERS + 8)
+            _pool = ThreadedConnectionPool(2, maxconn, DATABASE_URL)
+        return _pool
 
 
 def get_conn():
@@ -44,6 +56,37 @@ def return_conn(conn):
     pool.putconn(conn)
 
 
+@contextmanager
+def connection():
+    """``with connection() as conn:`` -- a pooled connection that is always
+    handed back, even if the body raises (same as get_conn/try/finally)."""
+    conn = get_conn()
+    try:
+        yield conn
+    finally:
+        return_conn(conn)
+
+
+@contextmanager
+def read_cursor(cursor_factory=None):
+    """``with read_cursor() as cur:`` for read-only queries.
+
+    The connection runs in autocommit for the duration, so a lookup is just
+    the query: no implicit BEGIN before it, and no ROLLBACK from the pool when
+    the still-open transaction is handed back. Writes keep using get_conn /
+    connection() with an explicit commit.
+    """
+    conn = get_conn()
+    try:
+        conn.autocommit = True
+        with conn.cursor(cursor_factory=cursor_factory) as cur:
+            yield cur
+    finally:
+        if not conn.closed:
+            conn.autocommit = False
+        return_conn(conn)
+
+
 def init_db():
     """Initialize database schema."""
     conn = get_conn()
@@ -92,9 +135,9 @@ def init_db():
                 CREATE INDEX IF NOT EXISTS idx_videos_channel ON videos(channel_id);
                 CREATE INDEX IF NOT EXISTS idx_videos_published ON videos(published_at);
                 CREATE INDEX IF NOT EXISTS idx_videos_ignored ON videos(is_ignored);
-                CREATE INDEX IF NOT EXISTS idx_title_samples_video ON title_samples(video_id);
+                CREATE INDEX IF NOT EXISTS idx_title_samples_video_at ON title_samples(video_id, sampled_at);
                 CREATE INDEX IF NOT EXISTS idx_title_samples_at ON title_samples(sampled_at);
-                CREATE INDEX IF NOT EXISTS idx_title_history_video ON title_history(video_id);
+                CREATE INDEX IF NOT EXISTS idx_title_history_video_date ON title_history(video_id, first_seen_date DESC);
                 CREATE INDEX IF NOT EXISTS idx_title_history_date ON title_history(first_seen_date);
             """)
             
@@ -177,11 +220,51 @@ def init_db():
                     ADD COLUMN IF NOT EXISTS track_from_date DATE DEFAULT CURRENT_DATE;
             """)
             cur.execute("CREATE INDEX IF NOT EXISTS idx_channels_enabled ON channels(enabled)")
+
+            # Shorts are never stored in `videos`, so without this the feed
+            # items newer than a channel's anchor that are shorts get re-probed
+            # (1-2 HTTP requests each) on every new-video check. A video's
+            # short/long-form status never changes, so the answer is kept forever.
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS short_flags (
+                    video_id TEXT PRIMARY KEY,
+                    is_short BOOLEAN NOT NULL,
+                    checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+            """)
+
+            # Migration: the per-video reads (recent-window stats, the stagnation
+            # check, history by date) all filter on video_id AND a time range or
+            # order by date, so they're served by the (video_id, sampled_at) /
+            # (video_id, first_seen_date) composites created above. The old
+            # video_id-only indexes are a prefix of those -- redundant, and each
+            # one is extra write work on every sample insert.
+            cur.execute("DROP INDEX IF EXISTS idx_title_samples_video")
+            cur.execute("DROP INDEX IF EXISTS idx_title_history_video")
         conn.commit()
     finally:
         return_conn(conn)
 
 
+def clear_all_data():
+    """Delete every channel, video, sample and history row (admin reset).
+
+    One TRUNCATE of all four tables: a single round-trip, and no per-row scan or
+    dead tuples the way sequential DELETEs would leave behind. RESTART IDENTITY
+    also resets the title_samples id sequence, so a reset really is a fresh start.
+    """
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "TRUNCATE title_samples, title_history, videos, channels, short_flags "
+                "RESTART IDENTITY CASCADE"
+            )
+        conn.commit()
+    _invalidate_known_ids()
+    with _history_lock:
+        _history_today.clear()
+
+
 def seed_channel_if_missing(channel_id: str, display_name: str):
     """Register a channel from the env-var seed list, but only if it doesn't
     already exist -- Postgres is the source of truth once a channel has been
@@ -253,87 +336,142 @@ def get_enabled_channels() -> List[dict]:
     """Channels the scheduler should actively poll: [{channel_id, display_name,
     track_from_date}, ...]. Read fresh every cycle so admin UI toggles take
     effect without a redeploy."""
-    conn = get_conn()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(
-                "SELECT channel_id, display_name, track_from_date "
-                "FROM channels WHERE enabled = TRUE"
-            )
-            return [dict(row) for row in cur.fetchall()]
-    finally:
-        return_conn(conn)
+    with read_cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            "SELECT channel_id, display_name, track_from_date "
+            "FROM channels WHERE enabled = TRUE"
+        )
+        return [dict(row) for row in cur.fetchall()]
 
 
 def get_channels_with_metrics() -> List[dict]:
     """All channels with enough data for an informed include/exclude decision:
     videos tracked, comments posted, comments/month, and avg likes+replies per
     comment. Used by the admin UI."""
-    conn = get_conn()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(
-                """
-                SELECT c.channel_id, c.display_name, c.enabled, c.created_at,
-                       c.track_from_date,
-                       COUNT(v.video_id) AS videos_tracked,
-                       COUNT(v.comment_id) AS comments_posted,
-                       COALESCE(AVG(v.comment_like_count) FILTER (WHERE v.comment_id IS NOT NULL), 0) AS avg_likes_per_comment,
-                       COALESCE(AVG(v.comment_reply_count) FILTER (WHERE v.comment_id IS NOT NULL), 0) AS avg_replies_per_comment,
-                       COALESCE(
-                           COUNT(v.comment_id) FILTER (WHERE v.comment_posted_at IS NOT NULL)
-                           / GREATEST(1.0, EXTRACT(EPOCH FROM (NOW() - MIN(v.comment_posted_at))) / (86400.0 * 30)),
-                           0
-                       ) AS comments_per_month
-                FROM channels c
-                LEFT JOIN videos v ON v.channel_id = c.channel_id
-                GROUP BY c.channel_id
-                ORDER BY c.created_at DESC
-                """
-            )
-            return [dict(row) for row in cur.fetchall()]
-    finally:
-        return_conn(conn)
+    with read_cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            """
+            SELECT c.channel_id, c.display_name, c.enabled, c.created_at,
+                   c.track_from_date,
+                   COUNT(v.video_id) AS videos_tracked,
+                   COUNT(v.comment_id) AS comments_posted,
+                   COALESCE(AVG(v.comment_like_count) FILTER (WHERE v.comment_id IS NOT NULL), 0) AS avg_likes_per_comment,
+                   COALESCE(AVG(v.comment_reply_count) FILTER (WHERE v.comment_id IS NOT NULL), 0) AS avg_replies_per_comment,
+                   COALESCE(
+                       COUNT(v.comment_id) FILTER (WHERE v.comment_posted_at IS NOT NULL)
+                       / GREATEST(1.0, EXTRACT(EPOCH FROM (NOW() - MIN(v.comment_posted_at))) / (86400.0 * 30)),
+                       0
+                   ) AS comments_per_month
+            FROM channels c
+            LEFT JOIN videos v ON v.channel_id = c.channel_id
+            GROUP BY c.channel_id
+            ORDER BY c.created_at DESC
+            """
+        )
+        return [dict(row) for row in cur.fetchall()]
 
 
 def video_exists(video_id: str) -> bool:
     """Check if video exists in database."""
-    conn = get_conn()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("SELECT 1 FROM videos WHERE video_id = %s", (video_id,))
-            return cur.fetchone() is not None
-    finally:
-        return_conn(conn)
+    with read_cursor() as cur:
+        cur.execute("SELECT 1 FROM videos WHERE video_id = %s", (video_id,))
+        return cur.fetchone() is not None
 
 
 def get_latest_video_id_for_channel(channel_id: str) -> Optional[str]:
     """Get the most recent video ID for a channel (by published_at)."""
+    with read_cursor() as cur:
+        cur.execute(
+            "SELECT video_id FROM videos WHERE channel_id = %s ORDER BY published_at DESC LIMIT 1",
+            (channel_id,),
+        )
+        row = cur.fetchone()
+        return row[0] if row else None
+
+
+def get_short_flags(video_ids: List[str]) -> dict:
+    """Stored shorts classifications for a batch of videos, in one query:
+    {video_id: is_short}. Videos never probed are absent."""
+    if not video_ids:
+        return {}
+    with read_cursor() as cur:
+        cur.execute(
+            "SELECT video_id, is_short FROM short_flags WHERE video_id = ANY(%s)",
+            (list(video_ids),),
+        )
+        return dict(cur.fetchall())
+
+
+def set_short_flags(flags: dict):
+    """Remember shorts classifications ({video_id: is_short}) in one statement."""
+    if not flags:
+        return
     conn = get_conn()
     try:
         with conn.cursor() as cur:
-            cur.execute(
-                "SELECT video_id FROM videos WHERE channel_id = %s ORDER BY published_at DESC LIMIT 1",
-                (channel_id,),
+            execute_values(
+                cur,
+                "INSERT INTO short_flags (video_id, is_short) VALUES %s "
+                "ON CONFLICT (video_id) DO UPDATE SET is_short = EXCLUDED.is_short, "
+                "checked_at = CURRENT_TIMESTAMP",
+                list(flags.items()),
             )
-            row = cur.fetchone()
-            return row[0] if row else None
+        conn.commit()
     finally:
         return_conn(conn)
 
 
-def get_known_video_ids_for_channel(channel_id: str, limit: int = 50) -> List[str]:
-    """Get known video IDs for a channel, newest first (for slice anchoring)."""
-    conn = get_conn()
-    try:
-        with conn.cursor() as cur:
-            cur.execute(
-                "SELECT video_id FROM videos WHERE channel_id = %s ORDER BY published_at DESC LIMIT %s",
-                (channel_id, limit),
-            )
-            return [row[0] for row in cur.fetchall()]
-    finally:
-        return_conn(conn)
+# Per-channel cache of known video ids for check_new_videos: channel_id ->
+# (frozenset of ids, time.monotonic() when read). add_video/clear_all_data in
+# this process invalidate it, so the TTL only matters for writes made elsewhere.
+_KNOWN_IDS_TTL = 180.0
+_known_ids_cache: dict = {}
+_known_ids_lock = threading.Lock()
+
+
+def get_known_video_id_sets(channel_ids: List[str], limit: int = 50) -> dict:
+    """{channel_id: frozenset of its newest ``limit`` known video ids} for a
+    whole polling tick. Cached channels are served from memory and all the
+    misses are read in ONE query, instead of one round-trip per channel."""
+    now = time.monotonic()
+    result = {}
+    with _known_ids_lock:
+        for channel_id in channel_ids:
+            hit = _known_ids_cache.get(channel_id)
+            if hit and now - hit[1] < _KNOWN_IDS_TTL:
+                result[channel_id] = hit[0]
+    missing = [c for c in channel_ids if c not in result]
+    if not missing:
+        return result
+    fetched = {channel_id: [] for channel_id in missing}
+    with read_cursor() as cur:
+        cur.execute(
+            """
+            SELECT channel_id, video_id FROM (
+                SELECT channel_id, video_id,
+                       ROW_NUMBER() OVER (PARTITION BY channel_id ORDER BY published_at DESC) AS rn
+                FROM videos
+                WHERE channel_id = ANY(%s)
+            ) ranked
+            WHERE rn <= %s
+            """,
+            (missing, limit),
+        )
+        for channel_id, video_id in cur.fetchall():
+            fetched[channel_id].append(video_id)
+    with _known_ids_lock:
+        for channel_id, ids in fetched.items():
+            result[channel_id] = frozenset(ids)
+            _known_ids_cache[channel_id] = (result[channel_id], now)
+    return result
+
+
+def _invalidate_known_ids(channel_id: Optional[str] = None):
+    with _known_ids_lock:
+        if channel_id is None:
+            _known_ids_cache.clear()
+        else:
+            _known_ids_cache.pop(channel_id, None)
 
 
 def add_video(
@@ -358,19 +496,33 @@ def add_video(
             )
             added = cur.rowcount > 0
         conn.commit()
+        if added:
+            _invalidate_known_ids(channel_id)
         return added
     finally:
         return_conn(conn)
 
 
-def add_title_sample(video_id: str, title: str):
-    """Add a title sample for a video."""
+def add_title_samples(video_id: str, titles: List[str]):
+    """Add a batch of title samples for a video in one statement and one commit
+    (a sampling run records up to FAST_SAMPLES titles at once)."""
+    if not titles:
+        return
     conn = get_conn()
     try:
         with conn.cursor() as cur:
-            cur.execute(
-                "INSERT INTO title_samples (video_id, title_text) VALUES (%s, %s)",
-                (video_id, title),
+            # Samples are re-collectable observations, not records we can't
+            # lose: an asynchronous commit skips waiting on the WAL flush, and a
+            # server crash can at worst drop the last fraction of a second of
+            # samples (never corrupt anything). Scoped to this transaction only.
+            cur.execute("SET LOCAL synchronous_commit TO OFF")
+            execute_values(
+                cur,
+                "INSERT INTO title_samples (video_id, title_text) VALUES %s",
+                [(video_id, title) for title in titles],
+                # One multi-row VALUES statement for the whole run; the default
+                # page_size (100) would split a larger SAMPLES_PER_RUN in two.
+                page_size=len(titles),
             )
         conn.commit()
     finally:
@@ -379,18 +531,14 @@ def add_title_sample(video_id: str, title: str):
 
 def get_title_stats(video_id: str) -> List[Tuple[str, int]]:
     """Get title statistics: [(title, count), ...] ordered by count desc."""
-    conn = get_conn()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(
-                "SELECT title_text, COUNT(*) as count "
-                "FROM title_samples WHERE video_id = %s "
-                "GROUP BY title_text ORDER BY count DESC",
-                (video_id,),
-            )
-            return [(r["title_text"], r["count"]) for r in cur.fetchall()]
-    finally:
-        return_conn(conn)
+    with read_cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            "SELECT title_text, COUNT(*) as count "
+            "FROM title_samples WHERE video_id = %s "
+            "GROUP BY title_text ORDER BY count DESC",
+            (video_id,),
+        )
+        return [(r["title_text"], r["count"]) for r in cur.fetchall()]
 
 
 def get_recent_title_stats(video_id: str, days: int) -> List[Tuple[str, int]]:
@@ -399,65 +547,39 @@ def get_recent_title_stats(video_id: str, days: int) -> List[Tuple[str, int]]:
     Used for the displayed A/B split so percentages reflect the experiment's
     CURRENT ratio rather than a lifetime average (the split shifts over time).
     """
-    conn = get_conn()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(
-                "SELECT title_text, COUNT(*) as count "
-                "FROM title_samples "
-                "WHERE video_id = %s AND sampled_at >= NOW() - make_interval(days => %s) "
-                "GROUP BY title_text ORDER BY count DESC",
-                (video_id, days),
-            )
-            return [(r["title_text"], r["count"]) for r in cur.fetchall()]
-    finally:
-        return_conn(conn)
+    with read_cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            "SELECT title_text, COUNT(*) as count "
+            "FROM title_samples "
+            "WHERE video_id = %s AND sampled_at >= NOW() - make_interval(days => %s) "
+            "GROUP BY title_text ORDER BY count DESC",
+            (video_id, days),
+        )
+        return [(r["title_text"], r["count"]) for r in cur.fetchall()]
 
 
 def get_title_daily_counts(video_id: str) -> List[dict]:
     """Per-day, per-title sample counts for the history timeline:
     [{day, title, count}, ...] ordered oldest day first."""
-    conn = get_conn()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(
-                "SELECT DATE(sampled_at) AS day, title_text AS title, COUNT(*) AS count "
-                "FROM title_samples WHERE video_id = %s "
-                "GROUP BY day, title_text ORDER BY day ASC",
-                (video_id,),
-            )
-            return [dict(r) for r in cur.fetchall()]
-    finally:
-        return_conn(conn)
-
-
-def get_total_samples(video_id: str) -> int:
-    """Get total number of samples for a video."""
-    conn = get_conn()
-    try:
-        with conn.cursor() as cur:
-            cur.execute(
-                "SELECT COUNT(*) FROM title_samples WHERE video_id = %s",
-                (video_id,),
-            )
-            return cur.fetchone()[0] or 0
-    finally:
-        return_conn(conn)
+    with read_cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            "SELECT DATE(sampled_at) AS day, title_text AS title, COUNT(*) AS count "
+            "FROM title_samples WHERE video_id = %s "
+            "GROUP BY day, title_text ORDER BY day ASC",
+            (video_id,),
+        )
+        return [dict(r) for r in cur.fetchall()]
 
 
 def get_comment_id(video_id: str) -> Optional[str]:
     """Get comment ID for a video."""
-    conn = get_conn()
-    try:
-        with conn.cursor() as cur:
-            cur.execute(
-                "SELECT comment_id FROM videos WHERE video_id = %s AND comment_id IS NOT NULL",
-                (video_id,),
-            )
-            row = cur.fetchone()
-            return row[0] if row else None
-    finally:
-        return_conn(conn)
+    with read_cursor() as cur:
+        cur.execute(
+            "SELECT comment_id FROM videos WHERE video_id = %s AND comment_id IS NOT NULL",
+            (video_id,),
+        )
+        row = cur.fetchone()
+        return row[0] if row else None
 
 
 def set_comment_id(video_id: str, comment_id: str, status: str = None, text: str = None):
@@ -482,21 +604,17 @@ def get_comment_state(video_id: str, refresh_hours: int) -> Optional[dict]:
     refresh_due is True when the last edit/post is older than refresh_hours, used
     to rate-limit percentage-only refreshes so we don't re-edit every hour.
     """
-    conn = get_conn()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(
-                "SELECT comment_id, comment_text, "
-                "  (COALESCE(comment_last_edited_at, comment_posted_at) IS NULL "
-                "   OR COALESCE(comment_last_edited_at, comment_posted_at) "
-                "      < NOW() - make_interval(hours => %s)) AS refresh_due "
-                "FROM videos WHERE video_id = %s",
-                (refresh_hours, video_id),
-            )
-            row = cur.fetchone()
-            return dict(row) if row else None
-    finally:
-        return_conn(conn)
+    with read_cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            "SELECT comment_id, comment_text, "
+            "  (COALESCE(comment_last_edited_at, comment_posted_at) IS NULL "
+            "   OR COALESCE(comment_last_edited_at, comment_posted_at) "
+            "      < NOW() - make_interval(hours => %s)) AS refresh_due "
+            "FROM videos WHERE video_id = %s",
+            (refresh_hours, video_id),
+        )
+        row = cur.fetchone()
+        return dict(row) if row else None
 
 
 def update_comment_meta(video_id: str, status: str, likes: int, replies: int):
@@ -595,140 +713,129 @@ def get_active_videos() -> List[dict]:
     Videos on a DISABLED channel are excluded: unticking a channel in the admin
     UI makes it fully dormant (no re-sampling, no comment edits), not just "stops
     picking up new videos". Its history stays in the DB and resumes when re-enabled.
-    """
-    conn = get_conn()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(
-                "SELECT v.video_id, v.channel_id, c.display_name AS channel_name, "
-                "       v.published_at, v.comment_id, v.comment_status "
-                "FROM videos v JOIN channels c ON v.channel_id = c.channel_id "
-                "WHERE v.is_active = TRUE AND v.is_ignored = FALSE AND v.is_deleted = FALSE "
-                "  AND c.enabled = TRUE "
-                "ORDER BY v.published_at DESC"
-            )
-            return [dict(row) for row in cur.fetchall()]
-    finally:
-        return_conn(conn)
-
 
-def get_title_history_by_date(video_id: str) -> List[Tuple[date, List[str]]]:
-    """Get title history grouped by first_seen_date: [(date, [titles]), ...]."""
-    conn = get_conn()
-    try:
-        with conn.cursor() as cur:
-            cur.execute(
-                "SELECT DISTINCT first_seen_date, title_text "
-                "FROM title_history WHERE video_id = %s "
-                "ORDER BY first_seen_date DESC, title_text",
-                (video_id,),
-            )
-            rows = cur.fetchall()
-            # Group by date
-            history = {}
-            for row_date, title in rows:
-                if row_date not in history:
-                    history[row_date] = []
-                history[row_date].append(title)
-            return sorted(history.items(), key=lambda x: x[0], reverse=True)
-    finally:
-        return_conn(conn)
+    Each row also carries ``titles``: the video's distinct sampled titles so
+    far, so the sweep doesn't query them per video before sampling.
+    """
+    with read_cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            "SELECT v.video_id, v.channel_id, c.display_name AS channel_name, "
+            "       v.published_at, v.comment_id, v.comment_status, "
+            "       ARRAY(SELECT DISTINCT ts.title_text FROM title_samples ts "
+            "             WHERE ts.video_id = v.video_id) AS titles "
+            "FROM videos v JOIN channels c ON v.channel_id = c.channel_id "
+            "WHERE v.is_active = TRUE AND v.is_ignored = FALSE AND v.is_deleted = FALSE "
+            "  AND c.enabled = TRUE "
+            "ORDER BY v.published_at DESC"
+        )
+        return [dict(row) for row in cur.fetchall()]
+
+
+# Titles already written to title_history for today, per video: video_id ->
+# (date, frozenset). Every hourly pass re-sees mostly the same titles, so once a
+# title is recorded for the day the per-title SELECT/INSERT can be skipped.
+# Cleared by clear_all_data. Entries from an earlier day are dropped whenever a
+# newer day is written, so videos that stop being sampled don't pile up.
+_history_today: dict = {}
+_history_lock = threading.Lock()
 
 
 def update_title_history(video_id: str, unique_titles: List[str], check_date: date):
     """Update title history: record which titles were seen on which dates."""
+    with _history_lock:
+        seen_date, seen = _history_today.get(video_id, (None, frozenset()))
+    if seen_date != check_date:
+        seen = frozenset()
+    pending = [t for t in unique_titles if t not in seen]
+    if not pending:
+        return
     conn = get_conn()
     try:
         with conn.cursor() as cur:
-            for title in unique_titles:
-                # Check if this title was already recorded for this date
-                cur.execute(
-                    "SELECT id FROM title_history "
-                    "WHERE video_id = %s AND title_text = %s AND first_seen_date = %s",
-                    (video_id, title, check_date),
-                )
-                if not cur.fetchone():
-                    # New title for this date, or update last_seen_date
-                    cur.execute(
-                        "INSERT INTO title_history (video_id, title_text, first_seen_date, last_seen_date) "
-                        "VALUES (%s, %s, %s, %s) "
-                        "ON CONFLICT (video_id, title_text, first_seen_date) "
-                        "DO UPDATE SET last_seen_date = EXCLUDED.last_seen_date",
-                        (video_id, title, check_date, check_date),
-                    )
+            # One statement for all titles; rows already recorded for this
+            # date are left alone (first_seen = last_seen = check_date there).
+            execute_values(
+                cur,
+                "INSERT INTO title_history (video_id, title_text, first_seen_date, last_seen_date) "
+                "VALUES %s ON CONFLICT (video_id, title_text, first_seen_date) DO NOTHING",
+                [(video_id, title, check_date, check_date) for title in pending],
+            )
         conn.commit()
     finally:
         return_conn(conn)
+    with _history_lock:
+        cur_date, cur_seen = _history_today.get(video_id, (None, frozenset()))
+        if cur_date == check_date:
+            base = cur_seen
+        else:
+            base = frozenset()
+            for vid in [v for v, (d, _) in _history_today.items() if d < check_date]:
+                del _history_today[vid]
+        _history_today[video_id] = (check_date, base | frozenset(pending))
 
 
 def get_unique_titles_for_date(video_id: str, check_date: date) -> set:
     """Get unique titles seen on a specific date."""
-    conn = get_conn()
-    try:
-        with conn.cursor() as cur:
-            cur.execute(
-                "SELECT DISTINCT title_text FROM title_samples "
-                "WHERE video_id = %s AND DATE(sampled_at) = %s",
-                (video_id, check_date),
-            )
-            return {row[0] for row in cur.fetchall()}
-    finally:
-        return_conn(conn)
+    with read_cursor() as cur:
+        cur.execute(
+            "SELECT DISTINCT title_text FROM title_samples "
+            "WHERE video_id = %s AND DATE(sampled_at) = %s",
+            (video_id, check_date),
+        )
+        return {row[0] for row in cur.fetchall()}
 
 
-def is_video_active(video_id: str, inactive_days: int) -> bool:
-    """
-    Check if video is active.
-    Non-active if: same single title for N days straight.
+def get_stagnated_video_ids(inactive_days: int) -> set:
+    """Active videos that have stagnated: exactly one distinct title on each of
+    their last ``inactive_days`` sampled days. Videos with fewer sampled days
+    than that don't qualify yet (not enough data).
+
+    One query for the whole hourly sweep instead of a per-video check.
     """
-    conn = get_conn()
-    try:
-        with conn.cursor() as cur:
-            # Get distinct titles per day for last N days
-            cur.execute(
-                """
-                SELECT DATE(sampled_at) as sample_date, COUNT(DISTINCT title_text) as title_count
-                FROM title_samples
-                WHERE video_id = %s
-                  AND sampled_at >= CURRENT_DATE - make_interval(days => %s)
-                GROUP BY DATE(sampled_at)
-                ORDER BY sample_date DESC
-                LIMIT %s
-                """,
-                (video_id, inactive_days, inactive_days),
-            )
-            rows = cur.fetchall()
-            if len(rows) < inactive_days:
-                return True  # Not enough data
-            
-            # Check if all last N days have exactly 1 title
-            return not all(row[1] == 1 for row in rows)
-    finally:
-        return_conn(conn)
+    with read_cursor() as cur:
+        cur.execute(
+            """
+            SELECT video_id
+            FROM (
+                SELECT video_id, title_count,
+                       ROW_NUMBER() OVER (PARTITION BY video_id ORDER BY sample_date DESC) AS rn
+                FROM (
+                    SELECT ts.video_id, DATE(ts.sampled_at) AS sample_date,
+                           COUNT(DISTINCT ts.title_text) AS title_count
+                    FROM title_samples ts
+                    JOIN videos v ON v.video_id = ts.video_id
+                    WHERE v.is_active = TRUE
+                      AND ts.sampled_at >= CURRENT_DATE - make_interval(days => %s)
+                    GROUP BY ts.video_id, DATE(ts.sampled_at)
+                ) per_day
+            ) recent
+            WHERE rn <= %s
+            GROUP BY video_id
+            HAVING COUNT(*) >= %s AND MAX(title_count) = 1
+            """,
+            (inactive_days, inactive_days, inactive_days),
+        )
+        return {row[0] for row in cur.fetchall()}
 
 
 def get_video_info(video_id: str) -> Optional[dict]:
     """Get full video info for dashboard."""
-    conn = get_conn()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(
-                """
-                SELECT v.*, c.display_name as channel_name,
-                       COUNT(DISTINCT ts.title_text) as unique_titles,
-                       COUNT(ts.id) as total_samples
-                FROM videos v
-                JOIN channels c ON v.channel_id = c.channel_id
-                LEFT JOIN title_samples ts ON v.video_id = ts.video_id
-                WHERE v.video_id = %s
-                GROUP BY v.video_id, c.display_name
-                """,
-                (video_id,),
-            )
-            row = cur.fetchone()
-            return dict(row) if row else None
-    finally:
-        return_conn(conn)
+    with read_cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            """
+            SELECT v.*, c.display_name as channel_name,
+                   COUNT(DISTINCT ts.title_text) as unique_titles,
+                   COUNT(ts.id) as total_samples
+            FROM videos v
+            JOIN channels c ON v.channel_id = c.channel_id
+            LEFT JOIN title_samples ts ON v.video_id = ts.video_id
+            WHERE v.video_id = %s
+            GROUP BY v.video_id, c.display_name
+            """,
+            (video_id,),
+        )
+        row = cur.fetchone()
+        return dict(row) if row else None
 
 
 def get_all_videos_summary() -> List[dict]:
@@ -738,73 +845,98 @@ def get_all_videos_summary() -> List[dict]:
     by all-time count, where `recent` is the count within the rolling window so
     the UI can show the current split (matching the comment).
     """
-    conn = get_conn()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(
-                """
-                WITH title_agg AS (
-                    SELECT video_id, title_text,
-                           COUNT(*) AS cnt,
-                           COUNT(*) FILTER (
-                               WHERE sampled_at >= NOW() - make_interval(days => %s)
-                           ) AS recent_cnt
-                    FROM title_samples
-                    GROUP BY video_id, title_text
-                )
-                SELECT v.video_id, v.channel_id, c.display_name as channel_name,
-                       v.published_at, v.is_ignored, v.is_deleted, v.is_active,
-                       v.comment_id, v.comment_status, v.comment_posted_at, v.comment_last_edited_at,
-                       v.comment_like_count, v.comment_reply_count,
-                       v.last_checked_at,
-                       COUNT(ta.title_text) as unique_titles,
-                       COALESCE(SUM(ta.cnt), 0) as total_samples,
-                       COALESCE(
-                           json_agg(
-                               json_build_object('title', ta.title_text,
-                                                 'count', ta.cnt,
-                                                 'recent', ta.recent_cnt)
-                               ORDER BY ta.cnt DESC
-                           ) FILTER (WHERE ta.title_text IS NOT NULL),
-                           '[]'
-                       ) as variants
-                FROM videos v
-                JOIN channels c ON v.channel_id = c.channel_id
-                LEFT JOIN title_agg ta ON v.video_id = ta.video_id
-                GROUP BY v.video_id, c.display_name
-                ORDER BY v.published_at DESC
-                """,
-                (RATIO_WINDOW_DAYS,),
+    with read_cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            """
+            WITH title_agg AS (
+                SELECT video_id, title_text,
+                       COUNT(*) AS cnt,
+                       COUNT(*) FILTER (
+                           WHERE sampled_at >= NOW() - make_interval(days => %s)
+                       ) AS recent_cnt
+                FROM title_samples
+                GROUP BY video_id, title_text
             )
-            return [dict(row) for row in cur.fetchall()]
-    finally:
-        return_conn(conn)
+            SELECT v.video_id, v.channel_id, c.display_name as channel_name,
+                   v.published_at, v.is_ignored, v.is_deleted, v.is_active,
+                   v.comment_id, v.comment_status, v.comment_posted_at, v.comment_last_edited_at,
+                   v.comment_like_count, v.comment_reply_count,
+                   v.last_checked_at,
+                   COUNT(ta.title_text) as unique_titles,
+                   COALESCE(SUM(ta.cnt), 0) as total_samples,
+                   COALESCE(
+                       json_agg(
+                           json_build_object('title', ta.title_text,
+                                             'count', ta.cnt,
+                                             'recent', ta.recent_cnt)
+                           ORDER BY ta.cnt DESC
+                       ) FILTER (WHERE ta.title_text IS NOT NULL),
+                       '[]'
+                   ) as variants
+            FROM videos v
+            JOIN channels c ON v.channel_id = c.channel_id
+            LEFT JOIN title_agg ta ON v.video_id = ta.video_id
+            GROUP BY v.video_id, c.display_name
+            ORDER BY v.published_at DESC
+            """,
+            (RATIO_WINDOW_DAYS,),
+        )
+        return [dict(row) for row in cur.fetchall()]
+
+
+def get_stats_counts() -> dict:
+    """Dashboard header counters, computed in one aggregate query.
+
+    Same population as get_all_videos_summary() (videos joined to a channel) so
+    the totals agree with the table, but only the integers come back -- no per-row
+    transfer just to count booleans in Python.
+    """
+    with read_cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            """
+            WITH multi AS (
+                SELECT video_id
+                FROM title_samples
+                GROUP BY video_id
+                HAVING COUNT(DISTINCT title_text) >= 2
+            )
+            SELECT COUNT(*) AS total_in_db,
+                   COUNT(*) FILTER (WHERE v.is_active) AS active_videos,
+                   COUNT(*) FILTER (WHERE v.is_active IS NOT TRUE) AS inactive_videos,
+                   COUNT(*) FILTER (
+                       WHERE v.is_active AND v.comment_id IS NOT NULL
+                   ) AS with_comments,
+                   COUNT(*) FILTER (
+                       WHERE v.is_active AND m.video_id IS NOT NULL
+                   ) AS multi_title
+            FROM videos v
+            JOIN channels c ON v.channel_id = c.channel_id
+            LEFT JOIN multi m ON m.video_id = v.video_id
+            """
+        )
+        return dict(cur.fetchone())
 
 
 def get_active_videos_for_dashboard() -> List[dict]:
     """Get tracked videos for dashboard (is_active=TRUE only)."""
-    conn = get_conn()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(
-                """
-                SELECT v.video_id, v.channel_id, c.display_name as channel_name,
-                       v.published_at, v.is_ignored, v.is_deleted, v.is_active,
-                       v.comment_id, v.comment_posted_at, v.comment_last_edited_at,
-                       v.last_checked_at,
-                       COUNT(DISTINCT ts.title_text) as unique_titles,
-                       COUNT(ts.id) as total_samples
-                FROM videos v
-                JOIN channels c ON v.channel_id = c.channel_id
-                LEFT JOIN title_samples ts ON v.video_id = ts.video_id
-                WHERE v.is_active = TRUE
-                GROUP BY v.video_id, c.display_name
-                ORDER BY v.published_at DESC
-                """,
-            )
-            return [dict(row) for row in cur.fetchall()]
-    finally:
-        return_conn(conn)
+    with read_cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            """
+            SELECT v.video_id, v.channel_id, c.display_name as channel_name,
+                   v.published_at, v.is_ignored, v.is_deleted, v.is_active,
+                   v.comment_id, v.comment_posted_at, v.comment_last_edited_at,
+                   v.last_checked_at,
+                   COUNT(DISTINCT ts.title_text) as unique_titles,
+                   COUNT(ts.id) as total_samples
+            FROM videos v
+            JOIN channels c ON v.channel_id = c.channel_id
+            LEFT JOIN title_samples ts ON v.video_id = ts.video_id
+            WHERE v.is_active = TRUE
+            GROUP BY v.video_id, c.display_name
+            ORDER BY v.published_at DESC
+            """,
+        )
+        return [dict(row) for row in cur.fetchall()]
 
 
 def get_videos_without_comments() -> List[dict]:
@@ -813,22 +945,18 @@ def get_videos_without_comments() -> List[dict]:
     Excludes disabled channels for the same reason as get_active_videos -- a
     paused channel does no work, including startup reprocessing.
     """
-    conn = get_conn()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(
-                """
-                SELECT v.video_id, v.channel_id, c.display_name as channel_name, v.published_at
-                FROM videos v
-                JOIN channels c ON v.channel_id = c.channel_id
-                WHERE v.is_active = TRUE
-                  AND v.is_ignored = FALSE
-                  AND v.is_deleted = FALSE
-                  AND v.comment_id IS NULL
-                  AND c.enabled = TRUE
-                ORDER BY v.published_at DESC
-                """
-            )
-            return [dict(row) for row in cur.fetchall()]
-    finally:
-        return_conn(conn)
+    with read_cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            """
+            SELECT v.video_id, v.channel_id, c.display_name as channel_name, v.published_at
+            FROM videos v
+            JOIN channels c ON v.channel_id = c.channel_id
+            WHERE v.is_active = TRUE
+              AND v.is_ignored = FALSE
+              AND v.is_deleted = FALSE
+              AND v.comment_id IS NULL
+              AND c.enabled = TRUE
+            ORDER BY v.published_at DESC
+            """
+        )
+        return [dict(row) for row in cur.fetchall()]
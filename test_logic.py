@@ -3,6 +3,9 @@ Unit tests for the pure logic that doesn't touch the network or the database:
   - InnerTube JSON parsing + cookieless variant sampler (youtube_innertube)
   - comment rendering (main.render_comment)
   - channel-id vs @handle detection (scraper._looks_like_channel_id)
+  - shorts probe answers and which of them get stored (scraper/main)
+  - RSS feed parsing and 304 reuse (scraper._get_videos_from_rss)
+  - quota vs deleted-comment error classification (youtube_comment)
 
 Run:  python test_logic.py
 
@@ -12,7 +15,7 @@ sandbox), so the suite runs both here and in the full Railway environment.
 import sys
 import types
 import unittest
-from datetime import date
+from datetime import date, datetime, timezone
 
 
 # --------------------------------------------------------------------------- #
@@ -215,6 +218,23 @@ class TestRenderComment(unittest.TestCase):
         self.assertEqual(self.render("INTRO", [], [], "vid1"), "INTRO")
 
 
+class TestPollBackoff(unittest.TestCase):
+    def setUp(self):
+        import main
+        self.main = main
+
+    def test_backs_off_when_quiet_up_to_cap(self):
+        m = self.main
+        interval = m.NEW_VIDEO_CHECK_INTERVAL
+        for _ in range(50):
+            interval = m._next_poll_interval(interval, found_new=False)
+        self.assertEqual(interval, max(m.NEW_VIDEO_CHECK_INTERVAL, m.MAX_NEW_VIDEO_INTERVAL))
+
+    def test_resets_on_new_video(self):
+        m = self.main
+        self.assertEqual(m._next_poll_interval(10_000, found_new=True), m.NEW_VIDEO_CHECK_INTERVAL)
+
+
 class TestChannelIdDetection(unittest.TestCase):
     def setUp(self):
         import scraper
@@ -229,5 +249,189 @@ class TestChannelIdDetection(unittest.TestCase):
         self.assertFalse(self.fn("UCtooShort"))
 
 
+class _FakeHead:
+    def __init__(self, status, location=None):
+        self.status_code = status
+        self.headers = {"Location": location} if location else {}
+        self.is_redirect = status in (301, 302, 303, 307, 308) and bool(location)
+
+
+class _FakePage:
+    def __init__(self, ok, body=b""):
+        self.ok = ok
+        self.body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def iter_content(self, chunk_size):
+        yield self.body
+
+
+class TestShortsProbe(unittest.TestCase):
+    """probe_short answers True/False only when a request actually decided it,
+    and None when nothing got through."""
+
+    def setUp(self):
+        import scraper
+        self.scraper = scraper
+        self.orig = (scraper._session.head, scraper._session.get)
+        self.gets = []
+
+    def tearDown(self):
+        self.scraper._session.head, self.scraper._session.get = self.orig
+
+    def _probe(self, head, page=None):
+        def fake_get(url, **kwargs):
+            self.gets.append(url)
+            if page is None:
+                raise ConnectionError("no network")
+            return page
+
+        self.scraper._session.head = lambda url, **kwargs: head
+        self.scraper._session.get = fake_get
+        return self.scraper.probe_short("vid")
+
+    def test_head_200_is_short(self):
+        self.assertIs(self._probe(_FakeHead(200)), True)
+        self.assertEqual(self.gets, [])
+
+    def test_redirect_to_watch_is_long_form(self):
+        head = _FakeHead(303, "https://www.youtube.com/watch?v=vid")
+        self.assertIs(self._probe(head), False)
+        self.assertEqual(self.gets, [])  # answered by the first hop alone
+
+    def test_consent_redirect_falls_through_to_watch_page(self):
+        head = _FakeHead(302, "https://consent.youtube.com/m?continue=x")
+        page = _FakePage(True, b'<meta property="og:url" content="https://www.youtube.com/shorts/vid">')
+        self.assertIs(self._probe(head, page), True)
+        self.assertEqual(len(self.gets), 1)
+
+    def test_watch_page_without_shorts_markers_is_long_form(self):
+        self.assertIs(self._probe(_FakeHead(404), _FakePage(True, b"<html><head>")), False)
+
+    def test_failed_probe_is_unknown(self):
+        self.assertIsNone(self._probe(_FakeHead(404)))                     # GET raised
+        self.assertIsNone(self._probe(_FakeHead(404), _FakePage(False)))  # GET non-2xx
+
+
+class TestClassifyShorts(unittest.TestCase):
+    def setUp(self):
+        import main
+        self.main = main
+        self.orig = (main.probe_short, main.set_short_flags)
+        self.stored = []
+        main.set_short_flags = self.stored.append
+
+    def tearDown(self):
+        self.main.probe_short, self.main.set_short_flags = self.orig
+
+    def test_only_definitive_answers_are_stored(self):
+        answers = {"short": True, "long": False, "failed": None}
+        self.main.probe_short = answers.get
+        flags = {"known": True}
+        self.main._classify_shorts(["known", "short", "long", "failed"], flags)
+        self.assertEqual(self.stored, [{"short": True, "long": False}])
+        self.assertNotIn("failed", flags)  # stays unclassified -> probed again next check
+        self.assertFalse(self.main._is_short("long", flags))
+
+    def test_failed_probe_is_retried(self):
+        results = iter([None, True])
+        self.main.probe_short = lambda video_id: next(results)
+        flags = {}
+        self.assertFalse(self.main._is_short("vid", flags))  # unknown counts as long-form for now
+        self.assertTrue(self.main._is_short("vid", flags))   # but is probed again
+        self.assertEqual(flags, {"vid": True})
+
+
+_FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" xmlns="http://www.w3.org/2005/Atom">
+ <title>Channel</title>
+ <entry><yt:videoId>vid00000001</yt:videoId><published>2026-03-03T12:00:00+00:00</published></entry>
+ <entry><yt:videoId>vid00000002</yt:videoId><published>2026-03-02T08:30:00Z</published></entry>
+ <entry><yt:videoId>vid00000003</yt:videoId><published>not a date</published></entry>
+ <entry><yt:videoId>vid00000004</yt:videoId><published>2026-03-01T00:00:00+00:00</published></entry>
+</feed>"""
+
+
+class _FakeFeedResponse:
+    def __init__(self, status, content=b"", headers=None):
+        self.status_code = status
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+class TestRssFeed(unittest.TestCase):
+    def setUp(self):
+        import scraper
+        self.scraper = scraper
+        self.orig_get = scraper._session.get
+        scraper._rss_validators.clear()
+        self.requests = []
+
+    def tearDown(self):
+        self.scraper._session.get = self.orig_get
+        self.scraper._rss_validators.clear()
+
+    def _serve(self, *responses):
+        queue = list(responses)
+
+        def fake_get(url, headers=None, **kwargs):
+            self.requests.append(headers or {})
+            return queue.pop(0)
+
+        self.scraper._session.get = fake_get
+
+    def test_parses_entries_and_z_suffix(self):
+        self._serve(_FakeFeedResponse(200, _FEED))
+        videos = self.scraper._get_videos_from_rss("UCx", max_videos=50)
+        self.assertEqual([v for v, _ in videos], ["vid00000001", "vid00000002", "vid00000004"])
+        self.assertEqual(videos[1][1], datetime(2026, 3, 2, 8, 30, tzinfo=timezone.utc))
+
+    def test_stops_at_max_videos(self):
+        self._serve(_FakeFeedResponse(200, _FEED))
+        videos = self.scraper._get_videos_from_rss("UCx", max_videos=2)
+        self.assertEqual([v for v, _ in videos], ["vid00000001", "vid00000002"])
+
+    def test_304_reuses_previous_parse(self):
+        self._serve(
+            _FakeFeedResponse(200, _FEED, {"ETag": '"v1"'}),
+            _FakeFeedResponse(304),
+        )
+        first = self.scraper._get_videos_from_rss("UCx", max_videos=50)
+        again = self.scraper._get_videos_from_rss("UCx", max_videos=1)
+        self.assertEqual(self.requests[1].get("If-None-Match"), '"v1"')
+        self.assertEqual(again, first[:1])
+
+
+class TestQuotaErrorClassification(unittest.TestCase):
+    def setUp(self):
+        import youtube_comment
+        self.fn = youtube_comment._is_quota_or_rate_error
+
+    @staticmethod
+    def _err(status, reason=None, content=None):
+        if content is None:
+            content = ('{"error": {"code": %d, "message": "x", "errors": [{"reason": "%s"}]}}'
+                       % (status, reason)).encode()
+        return types.SimpleNamespace(resp=types.SimpleNamespace(status=status), content=content)
+
+    def test_quota_reasons(self):
+        self.assertTrue(self.fn(self._err(403, "quotaExceeded")))
+        self.assertTrue(self.fn(self._err(403, "userRateLimitExceeded")))
+        self.assertTrue(self.fn(self._err(429, content=b"")))
+
+    def test_forbidden_comment_is_not_quota(self):
+        self.assertFalse(self.fn(self._err(403, "forbidden")))
+        self.assertFalse(self.fn(self._err(404, "commentNotFound")))
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
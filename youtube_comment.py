@@ -1,4 +1,9 @@
 """Post and update a top-level comment on a video using YouTube Data API v3 (OAuth)."""
+import json
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
@@ -6,6 +11,8 @@ from googleapiclient.errors import HttpError
 
 from config import YOUTUBE_CLIENT_ID, YOUTUBE_CLIENT_SECRET, YOUTUBE_REFRESH_TOKEN
 
+logger = logging.getLogger(__name__)
+
 SCOPES = ["https://www.googleapis.com/auth/youtube.force-ssl"]
 
 # The real YouTube moderationStatus values. When the API omits the field on a
@@ -22,6 +29,20 @@ def _normalize_status(moderation_status, is_public):
     return "published"
 
 
+# Data API error reasons that mean "out of quota / slow down", not "forbidden".
+_QUOTA_REASONS = frozenset(
+    ("quotaExceeded", "dailyLimitExceeded", "rateLimitExceeded", "userRateLimitExceeded")
+)
+
+
+def _error_reasons(exc) -> set:
+    """The ``reason`` codes from an HttpError's JSON body (empty if unparseable)."""
+    try:
+        return {err.get("reason") for err in json.loads(exc.content)["error"]["errors"]}
+    except (AttributeError, ValueError, KeyError, TypeError):
+        return set()
+
+
 def _is_quota_or_rate_error(exc) -> bool:
     """True if an API error is a quota/rate-limit condition.
 
@@ -29,7 +50,15 @@ def _is_quota_or_rate_error(exc) -> bool:
     comment), so callers MUST check this before treating a 403 as "deleted" --
     otherwise hitting the daily quota would wrongly mark videos as ignored and
     drop them from tracking permanently (the quota resets at midnight PT).
+
+    Decided from the status and the structured error reasons; the message text
+    is only searched when the body carries no reasons at all.
     """
+    if getattr(getattr(exc, "resp", None), "status", None) == 429:
+        return True
+    reasons = _error_reasons(exc)
+    if reasons:
+        return not reasons.isdisjoint(_QUOTA_REASONS)
     s = str(exc).lower()
     return (
         "quota" in s
@@ -39,34 +68,106 @@ def _is_quota_or_rate_error(exc) -> bool:
     )
 
 
+# The refreshed credentials, reused across calls: an access token lasts about
+# an hour, so refreshing on every post/edit/meta read only cost a round-trip to
+# the token endpoint each time.
+_creds = None
+_creds_lock = threading.Lock()
+
+# Refresh this long before the token's expiry, so a token handed out here can't
+# lapse mid-request and come back as a 401 (and a second, retried call).
+_TOKEN_LEEWAY = timedelta(minutes=5)
+
+
+def _token_fresh(creds) -> bool:
+    # google-auth keeps expiry as naive UTC.
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return bool(creds.token) and creds.expiry is not None and creds.expiry - now > _TOKEN_LEEWAY
+
+
 def get_credentials():
-    """Build credentials from refresh token (set in env for Railway)."""
+    """Build credentials from refresh token (set in env for Railway).
+
+    Returns the cached credentials while their access token has more than
+    _TOKEN_LEEWAY left, and otherwise refreshes that same object in place
+    (so anything already holding it picks up the new token).
+
+    Refreshes are single-flight: when several workers find the token stale at
+    once, one refreshes under the lock and the rest wait and reuse its result
+    rather than each hitting the token endpoint.
+    """
+    global _creds
     if not YOUTUBE_CLIENT_ID or not YOUTUBE_CLIENT_SECRET or not YOUTUBE_REFRESH_TOKEN:
-        print("Missing YouTube credentials (CLIENT_ID, CLIENT_SECRET, or REFRESH_TOKEN)")
+        logger.error("Missing YouTube credentials (CLIENT_ID, CLIENT_SECRET, or REFRESH_TOKEN)")
         return None
-    try:
-        creds = Credentials(
-            token=None,
-            refresh_token=YOUTUBE_REFRESH_TOKEN,
-            token_uri="https://oauth2.googleapis.com/token",
-            client_id=YOUTUBE_CLIENT_ID,
-            client_secret=YOUTUBE_CLIENT_SECRET,
-            scopes=SCOPES,
-        )
-        creds.refresh(Request())
+    creds = _creds
+    if creds is not None and _token_fresh(creds):
         return creds
-    except Exception as e:
-        print(f"Failed to refresh credentials: {e}")
+    with _creds_lock:
+        creds = _creds
+        if creds is not None and _token_fresh(creds):
+            return creds  # another thread refreshed while we waited
+        try:
+            if creds is None:
+                creds = Credentials(
+                    token=None,
+                    refresh_token=YOUTUBE_REFRESH_TOKEN,
+                    token_uri="https://oauth2.googleapis.com/token",
+                    client_id=YOUTUBE_CLIENT_ID,
+                    client_secret=YOUTUBE_CLIENT_SECRET,
+                    scopes=SCOPES,
+                )
+            creds.refresh(Request())
+            _creds = creds
+            return creds
+        except Exception as e:
+            # A failed refresh inside the leeway window leaves a token that is
+            # still usable -- keep posting with it and retry the refresh on the
+            # next call, rather than skipping this post/edit.
+            if creds is not None and creds.valid:
+                logger.warning("Failed to refresh credentials, using current token: %s", e)
+                return creds
+            logger.error("Failed to refresh credentials: %s", e)
+            return None
+
+
+# Data API client per thread. build() parses the discovery document and sets up
+# a fresh resource tree every call, and the httplib2 transport underneath isn't
+# safe to share between threads. The client holds the cached credentials object,
+# which get_credentials refreshes in place, so it never needs rebuilding for a
+# new token.
+_local = threading.local()
+
+# Retries for the idempotent calls (comment edit, metadata read): googleapiclient
+# retries 5xx, 429 and rate-limit 403s itself, with jittered exponential backoff,
+# reusing this thread's client. Inserts are never retried -- a post that
+# succeeded server-side but failed on the way back would be posted twice.
+_IDEMPOTENT_RETRIES = 2
+
+
+def get_service():
+    """This thread's YouTube Data API client, or None without credentials."""
+    creds = get_credentials()
+    if not creds:
         return None
+    cached = getattr(_local, "service", None)
+    if cached is None or cached[0] is not creds:
+        # Use the discovery document bundled with the library (no fetch from
+        # discovery.googleapis.com) and skip the file cache, which would only
+        # log a warning about oauth2client on every build.
+        service = build("youtube", "v3", credentials=creds,
+                        cache_discovery=False, static_discovery=True)
+        cached = (creds, service)
+        _local.service = cached
+    return cached[1]
 
 
 def post_comment(video_id: str, text: str) -> tuple[str | None, str | None]:
     """Post a top-level comment; returns (comment_id, moderation_status)."""
-    creds = get_credentials()
-    if not creds:
-        print(f"No credentials available for posting comment on {video_id}")
+    youtube = get_service()
+    if youtube is None:
+        logger.error("No credentials available for posting comment on %s", video_id)
         return None, None
-    youtube = build("youtube", "v3", credentials=creds)
     body = {
         "snippet": {
             "videoId": video_id,
@@ -84,16 +185,16 @@ def post_comment(video_id: str, text: str) -> tuple[str | None, str | None]:
         raw = response["snippet"]["topLevelComment"]["snippet"].get("moderationStatus")
         is_public = response["snippet"].get("isPublic", None)
         status = _normalize_status(raw, is_public)
-        print(f"Comment {comment_id} on {video_id}: {status.upper()}")
+        logger.info("Comment %s on %s: %s", comment_id, video_id, status.upper())
         return comment_id, status
     except HttpError as e:
         if _is_quota_or_rate_error(e):
-            print(f"QUOTA/RATE LIMIT - cannot post comment on {video_id}")
+            logger.warning("QUOTA/RATE LIMIT - cannot post comment on %s", video_id)
             return None, "quota_exceeded"
-        print(f"API error posting comment on {video_id}: {e}")
+        logger.error("API error posting comment on %s: %s", video_id, e)
         return None, "error"
     except Exception as e:
-        print(f"Unexpected error posting comment on {video_id}: {e}")
+        logger.exception("Unexpected error posting comment on %s: %s", video_id, e)
         return None, "error"
 
 
@@ -103,10 +204,9 @@ def update_comment(comment_id: str, text: str) -> bool:
     Returns True on success, False on error.
     Raises exception if comment was deleted (404/403) so caller can mark video as ignored.
     """
-    creds = get_credentials()
-    if not creds:
+    youtube = get_service()
+    if youtube is None:
         return False
-    youtube = build("youtube", "v3", credentials=creds)
     body = {
         "id": comment_id,
         "snippet": {
@@ -114,7 +214,7 @@ def update_comment(comment_id: str, text: str) -> bool:
         },
     }
     try:
-        youtube.comments().update(part="snippet", body=body).execute()
+        youtube.comments().update(part="snippet", body=body).execute(num_retries=_IDEMPOTENT_RETRIES)
         return True
     except HttpError as e:
         # Quota/rate-limit errors ALSO come back as 403 -- check them FIRST and
@@ -122,14 +222,14 @@ def update_comment(comment_id: str, text: str) -> bool:
         # edit attempt after the daily quota runs out would be misread as "comment
         # deleted" and permanently drop the video from tracking.
         if _is_quota_or_rate_error(e):
-            print(f"Quota/rate limit updating comment {comment_id} - will retry later")
+            logger.warning("Quota/rate limit updating comment %s - will retry later", comment_id)
             return False
         # A genuine 404 (and, after ruling out quota, a 403) means the comment is
         # gone / no longer editable -- re-raise so the caller marks it ignored.
         if e.resp.status in (404, 403):
-            print(f"Comment {comment_id} not found (deleted?) - status {e.resp.status}")
+            logger.warning("Comment %s not found (deleted?) - status %s", comment_id, e.resp.status)
             raise
-        print(f"API error updating comment: {e}")
+        logger.error("API error updating comment: %s", e)
         return False
 
 
@@ -140,12 +240,13 @@ def fetch_comment_meta(comment_id: str):
     comment flip to 'published' once approved, and tracks likes/replies as a
     virality signal.
     """
-    creds = get_credentials()
-    if not creds:
+    youtube = get_service()
+    if youtube is None:
         return None
-    youtube = build("youtube", "v3", credentials=creds)
     try:
-        resp = youtube.commentThreads().list(part="snippet", id=comment_id).execute()
+        resp = youtube.commentThreads().list(part="snippet", id=comment_id).execute(
+            num_retries=_IDEMPOTENT_RETRIES
+        )
         items = resp.get("items", [])
         if not items:
             return None
@@ -36,6 +36,7 @@ variants are rare, so ~50 samples is the floor for a skewed split):
     python youtube_innertube.py dQw4w9WgXcQ 50
 """
 import html as _html
+import http.cookiejar
 import json
 import random
 import re as _re
@@ -45,6 +46,9 @@ from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Set
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from config import SCHEDULER_WORKERS
 
 _INNERTUBE_URL = "https://www.youtube.com/youtubei/v1/{endpoint}?prettyPrint=false"
 # Public InnerTube key used by the YouTube web client. Not a secret -- it ships
@@ -76,13 +80,15 @@ _CLIENTS = {
 }
 _CLIENT_KEYS = list(_CLIENTS.keys())
 
+_WHITESPACE_RE = _re.compile(r"\s+")
+
 
 # --------------------------------------------------------------------------- #
 # Pure helpers (no network -- unit tested in test_logic.py)
 # --------------------------------------------------------------------------- #
 def normalize_title(text: str) -> str:
     """Unescape HTML entities and collapse whitespace so variants compare cleanly."""
-    return _re.sub(r"\s+", " ", _html.unescape(text or "")).strip()
+    return _WHITESPACE_RE.sub(" ", _html.unescape(text or "")).strip()
 
 
 def _find_all(obj, key: str) -> List:
@@ -141,6 +147,21 @@ def extract_titles_from_player(data: dict) -> Set[str]:
 # --------------------------------------------------------------------------- #
 # Network
 # --------------------------------------------------------------------------- #
+# One keep-alive session shared by every sampling thread, so each sample reuses a
+# pooled TLS connection to youtube.com instead of handshaking per POST. It must
+# stay cookieless: the cookie policy refuses everything YouTube sets (notably
+# VISITOR_INFO1_LIVE), so no request ever carries an identity and each one is
+# still a fresh viewer. The pool has room for every scheduler worker sampling a
+# video at once (SAMPLE_WORKERS threads each, see sample_variant_titles).
+SAMPLE_WORKERS = 8  # max concurrent POSTs per parallel sample_variant_titles call
+_session = requests.Session()
+_session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+_session.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=SCHEDULER_WORKERS * SAMPLE_WORKERS,
+))
+
+
 def _context(client_key: str) -> dict:
     c = _CLIENTS[client_key]
     return {"client": {
@@ -167,14 +188,14 @@ def _post(endpoint: str, video_id: str, client_key: str,
           timeout: float = 15.0) -> Optional[dict]:
     """One InnerTube POST. Returns parsed JSON or None on any failure.
 
-    Sent cookieless and with no visitorData, so YouTube mints a fresh viewer
-    identity for this request -- that is what puts each sample in an independent
-    experiment bucket.
+    Sent cookieless (see _session) and with no visitorData, so YouTube mints a
+    fresh viewer identity for this request -- that is what puts each sample in
+    an independent experiment bucket.
     """
     url = _INNERTUBE_URL.format(endpoint=endpoint) + f"&key={_INNERTUBE_KEY}"
     payload = {"context": _context(client_key), "videoId": video_id}
     try:
-        r = requests.post(url, headers=_headers(client_key),
+        r = _session.post(url, headers=_headers(client_key),
                           data=json.dumps(payload), timeout=timeout)
         if r.status_code != 200:
             return None
@@ -231,7 +252,7 @@ def sample_variant_titles(video_id: str, samples: int = 40, delay: float = 0.8,
 
     if parallel:
         observed: List[str] = []
-        with ThreadPoolExecutor(max_workers=min(samples, 8)) as ex:
+        with ThreadPoolExecutor(max_workers=min(samples, SAMPLE_WORKERS)) as ex:
             futures = [
                 ex.submit(_sample_once, video_id, _CLIENT_KEYS[i % len(_CLIENT_KEYS)])
                 for i in range(samples)